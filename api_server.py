@@ -1,14 +1,35 @@
 #!/usr/bin/env python3
 
+import hashlib
 import os
+import shutil
 import tempfile
 import subprocess
-from typing import List, Optional
+import textwrap
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Literal, NamedTuple, Optional, Tuple
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse
-from pydantic import BaseModel
-import requests
+from pydantic import BaseModel, Field
+from starlette.background import BackgroundTask
+
+# `requests` (~70 ms to import) is loaded on first use so the server starts
+# listening sooner after a scale-to-zero cold start; go through http().
+_requests = None
+
+
+def http():
+    """The ``requests`` module, imported once, on first use."""
+    global _requests
+    if _requests is None:
+        import requests
+
+        _requests = requests
+    return _requests
+
 
 app = FastAPI(title="TikTok Search API")
 
@@ -22,6 +43,134 @@ app.add_middleware(
 
 SENSO_API = "https://sdk.senso.ai/api/v1"
 APIFY_RUN_SYNC_ITEMS = "https://api.apify.com/v2/acts/clockworks~tiktok-scraper/run-sync-get-dataset-items"
+FONT_CANDIDATES = (
+    "/System/Library/Fonts/Helvetica.ttc",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/TTF/DejaVuSans.ttf",
+    "/usr/share/fonts/dejavu/DejaVuSans.ttf",
+)
+
+
+class RenderConfig(NamedTuple):
+    ffmpeg: str
+    magick: str
+    font: str  # drawtext font option, e.g. "fontfile=/path/font.ttf"
+
+
+def resolve_render_config() -> RenderConfig:
+    """Locate ffmpeg, ImageMagick and a caption font once, at startup."""
+    ffmpeg = os.getenv("FFMPEG_PATH") or shutil.which("ffmpeg") or "ffmpeg"
+    magick = os.getenv("MAGICK_PATH") or shutil.which("magick") or shutil.which("convert") or "magick"
+    font_path = os.getenv("FONT_PATH") or next((f for f in FONT_CANDIDATES if os.path.exists(f)), "")
+    font = f"fontfile={font_path}" if font_path else "font=Sans"  # fall back to fontconfig
+    return RenderConfig(ffmpeg, magick, font)
+
+
+RENDER = resolve_render_config()
+
+# Preview renders: same overlay at a third of the size, for a few seconds.
+PREVIEW_SCALE = 1 / 3
+PREVIEW_FPS = 15
+PREVIEW_SECONDS = 6
+
+# Downloaded videos and logos, keyed by URL, so a preview and the full render
+# that follows it download each input once.
+INPUT_CACHE_DIR = os.getenv("RENDER_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "render_inputs")
+INPUT_CACHE_TTL = 3600  # seconds since last use
+_input_locks: Dict[str, Tuple[threading.Lock, int]] = {}  # path -> (lock, holders + waiters)
+_input_locks_guard = threading.Lock()
+
+
+@contextmanager
+def _input_lock(path: str) -> Iterator[None]:
+    """Serialize work on one cached input; the lock is dropped once nobody needs it."""
+    with _input_locks_guard:
+        lock, users = _input_locks.get(path, (None, 0))
+        lock = lock or threading.Lock()
+        _input_locks[path] = (lock, users + 1)
+    try:
+        with lock:
+            yield
+    finally:
+        with _input_locks_guard:
+            lock, users = _input_locks[path]
+            if users == 1:
+                del _input_locks[path]
+            else:
+                _input_locks[path] = (lock, users - 1)
+
+
+def _prune_inputs() -> None:
+    cutoff = time.time() - INPUT_CACHE_TTL
+    for entry in os.scandir(INPUT_CACHE_DIR):
+        try:
+            if entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+        except OSError:
+            pass
+
+
+def fetch_input(url: str, timeout: int = 60) -> str:
+    """Download ``url`` into the input cache (once) and return its local path."""
+    os.makedirs(INPUT_CACHE_DIR, exist_ok=True)
+    path = os.path.join(INPUT_CACHE_DIR, hashlib.sha256(url.encode("utf-8")).hexdigest())
+    with _input_lock(path):
+        if os.path.exists(path):
+            os.utime(path)  # keep recently used inputs past the TTL
+            return path
+        _prune_inputs()
+        resp = http().get(url, timeout=timeout)
+        resp.raise_for_status()
+        tmp_path = f"{path}.{os.getpid()}.tmp"  # workers may share the cache dir
+        with open(tmp_path, "wb") as f:
+            f.write(resp.content)
+        os.replace(tmp_path, path)
+    return path
+
+
+def fetch_logo(url: str) -> str:
+    """Cached logo as something ffmpeg can read (SVGs are rasterized once)."""
+    raw_path = fetch_input(url, timeout=30)
+    if not url.endswith(".svg"):
+        return raw_path
+    logo_path = f"{raw_path}.png"
+    with _input_lock(logo_path):
+        if os.path.exists(logo_path):
+            os.utime(logo_path)
+            return logo_path
+        convert_result = subprocess.run(
+            [RENDER.magick, raw_path, "-background", "none", f"png:{logo_path}.{os.getpid()}.tmp"],
+            capture_output=True,
+            text=True,
+            timeout=10
+        )
+        if convert_result.returncode != 0:
+            raise HTTPException(status_code=500, detail=f"Logo conversion failed: {convert_result.stderr}")
+        os.replace(f"{logo_path}.{os.getpid()}.tmp", logo_path)
+    return logo_path
+
+
+def overlay_filter(lines: List[str], scale: float = 1.0, fps: Optional[int] = None) -> str:
+    """
+    The branded overlay (caption band, three caption lines, centered logo) on
+    a 1080x1920 canvas; ``scale`` shrinks the canvas and every offset with it
+    so previews match the full render's layout.
+    """
+    def px(value: int) -> int:
+        return max(1, round(value * scale))
+
+    width, height = px(1080) // 2 * 2, px(1920) // 2 * 2  # libx264 needs even sizes
+    text = f"{RENDER.font}:fontsize={px(48)}:fontcolor=white:x=(w-tw)/2:borderw={px(2)}:bordercolor=black"
+    rate = f"fps={fps}," if fps else ""
+    return (
+        f"[0:v]{rate}scale={width}:{height}:force_original_aspect_ratio=decrease,pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,format=yuv420p[vid];"
+        f"[vid]drawbox=y=ih-{px(350)}:color=black@0.6:width=iw:height={px(350)}:t=fill[vid_grad];"
+        f"[vid_grad]drawtext=text='{lines[0]}':{text}:y=h-{px(320)}[t1];"
+        f"[t1]drawtext=text='{lines[1]}':{text}:y=h-{px(260)}[t2];"
+        f"[t2]drawtext=text='{lines[2]}':{text}:y=h-{px(200)}[vid_text];"
+        f"[1:v]scale={px(200)}:-1[logo];"
+        f"[vid_text][logo]overlay=x=(W-w)/2:y=h-{px(150)}[final]"
+    )
 
 class TikTokSearchRequest(BaseModel):
     profiles: Optional[List[str]] = None
@@ -44,11 +193,14 @@ class GenerateVideoRequest(BaseModel):
     video_url: str
     logo_url: str
     caption: str
+    # "preview": low-res, short, ultrafast MP4; "still": one full-size JPEG frame
+    mode: Literal["full", "preview", "still"] = "full"
+    still_at: float = Field(1.0, ge=0)  # seconds into the video, for mode="still"
 
 def run_apify_actor(actor_input: dict, token: str, timeout: int = 120) -> List[dict]:
     params = {"token": token}
     headers = {"Content-Type": "application/json"}
-    resp = requests.post(
+    resp = http().post(
         APIFY_RUN_SYNC_ITEMS, params=params, json=actor_input, headers=headers, timeout=timeout
     )
     resp.raise_for_status()
@@ -131,89 +283,89 @@ async def search_tiktok(request: TikTokSearchRequest):
     return {"videos": formatted_videos}
 
 @app.post("/api/video/generate")
-async def generate_branded_video(request: GenerateVideoRequest):
+def generate_branded_video(request: GenerateVideoRequest):
+    # A plain ``def`` runs in FastAPI's threadpool, so a quick preview is not
+    # stuck behind someone else's full encode on the event loop.
     tmpdir = tempfile.mkdtemp()
-    video_path = os.path.join(tmpdir, "input.mp4")
-    logo_raw_path = os.path.join(tmpdir, "logo_raw")
-    logo_path = os.path.join(tmpdir, "logo.png")
-    output_path = os.path.join(tmpdir, "output.mp4")
-    
     try:
-        video_resp = requests.get(request.video_url, timeout=60)
-        video_resp.raise_for_status()
-        with open(video_path, "wb") as f:
-            f.write(video_resp.content)
-        
-        logo_resp = requests.get(request.logo_url, timeout=30)
-        logo_resp.raise_for_status()
-        with open(logo_raw_path, "wb") as f:
-            f.write(logo_resp.content)
-        
-        if request.logo_url.endswith(".svg"):
-            magick_path = os.getenv("MAGICK_PATH", "magick")
-            convert_result = subprocess.run(
-                [magick_path, logo_raw_path, "-background", "none", logo_path],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            if convert_result.returncode != 0:
-                raise HTTPException(status_code=500, detail=f"Logo conversion failed: {convert_result.stderr}")
-        else:
-            os.rename(logo_raw_path, logo_path)
-        
-        import textwrap
+        video_path = fetch_input(request.video_url)
+        logo_path = fetch_logo(request.logo_url)
+
         lines = textwrap.wrap(request.caption, width=30)
         while len(lines) < 3:
             lines.append("")
         lines = lines[:3]
-        
+
         escaped_lines = [line.replace("'", "'\\''").replace(":", "\\:") for line in lines]
-        
-        ffmpeg_path = os.getenv("FFMPEG_PATH", "ffmpeg")
-        magick_path = os.getenv("MAGICK_PATH", "magick")
-        
-        ffmpeg_cmd = [
-            ffmpeg_path, "-y", "-i", video_path, "-i", logo_path,
-            "-filter_complex",
-            (
-                f"[0:v]scale=1080:1920:force_original_aspect_ratio=decrease,pad=1080:1920:(ow-iw)/2:(oh-ih)/2,format=yuv420p[vid];"
-                f"[vid]drawbox=y=ih-350:color=black@0.6:width=iw:height=350:t=fill[vid_grad];"
-                f"[vid_grad]drawtext=text='{escaped_lines[0]}':fontfile=/System/Library/Fonts/Helvetica.ttc:fontsize=48:fontcolor=white:x=(w-tw)/2:y=h-320:borderw=2:bordercolor=black[t1];"
-                f"[t1]drawtext=text='{escaped_lines[1]}':fontfile=/System/Library/Fonts/Helvetica.ttc:fontsize=48:fontcolor=white:x=(w-tw)/2:y=h-260:borderw=2:bordercolor=black[t2];"
-                f"[t2]drawtext=text='{escaped_lines[2]}':fontfile=/System/Library/Fonts/Helvetica.ttc:fontsize=48:fontcolor=white:x=(w-tw)/2:y=h-200:borderw=2:bordercolor=black[vid_text];"
-                f"[1:v]scale=200:-1[logo];"
-                f"[vid_text][logo]overlay=x=(W-w)/2:y=h-150[final]"
-            ),
-            "-map", "[final]",
-            "-map", "0:a?",
-            "-c:v", "libx264",
-            "-preset", "fast",
-            "-c:a", "copy",
-            "-t", "30",
-            output_path
-        ]
-        
-        result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True, timeout=120)
-        
+
+        if request.mode == "still":
+            output_path = os.path.join(tmpdir, "still.jpg")
+            ffmpeg_cmd = [
+                RENDER.ffmpeg, "-y", "-ss", str(request.still_at), "-i", video_path, "-i", logo_path,
+                "-filter_complex", overlay_filter(escaped_lines),
+                "-map", "[final]",
+                "-frames:v", "1",
+                "-q:v", "3",
+                output_path
+            ]
+            media_type, filename, timeout = "image/jpeg", "branded_video_still.jpg", 30
+        elif request.mode == "preview":
+            output_path = os.path.join(tmpdir, "preview.mp4")
+            ffmpeg_cmd = [
+                RENDER.ffmpeg, "-y", "-t", str(PREVIEW_SECONDS), "-i", video_path, "-i", logo_path,
+                "-filter_complex", overlay_filter(escaped_lines, PREVIEW_SCALE, PREVIEW_FPS),
+                "-map", "[final]",
+                "-an",
+                "-c:v", "libx264",
+                "-preset", "ultrafast",
+                "-crf", "30",
+                output_path
+            ]
+            media_type, filename, timeout = "video/mp4", "branded_video_preview.mp4", 60
+        else:
+            output_path = os.path.join(tmpdir, "output.mp4")
+            ffmpeg_cmd = [
+                RENDER.ffmpeg, "-y", "-i", video_path, "-i", logo_path,
+                "-filter_complex", overlay_filter(escaped_lines),
+                "-map", "[final]",
+                "-map", "0:a?",
+                "-c:v", "libx264",
+                "-preset", "fast",
+                "-c:a", "copy",
+                "-t", "30",
+                output_path
+            ]
+            media_type, filename, timeout = "video/mp4", "branded_video.mp4", 120
+
+        result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True, timeout=timeout)
+
         if result.returncode != 0:
             raise HTTPException(status_code=500, detail=f"FFmpeg failed: {result.stderr}")
-        
+
         if not os.path.exists(output_path):
+            if request.mode == "still":
+                # ffmpeg exits 0 without writing a frame when -ss is past the end
+                raise HTTPException(status_code=400, detail=f"still_at={request.still_at}s is past the end of the video")
             raise HTTPException(status_code=500, detail="Output file not created")
-        
+
         return FileResponse(
             output_path,
-            media_type="video/mp4",
-            filename="branded_video.mp4",
-            background=None
+            media_type=media_type,
+            filename=filename,
+            background=BackgroundTask(shutil.rmtree, tmpdir, ignore_errors=True)
         )
-        
-    except requests.RequestException as e:
+
+    except HTTPException:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+        raise
+    except http().RequestException as e:
+        shutil.rmtree(tmpdir, ignore_errors=True)
         raise HTTPException(status_code=500, detail=f"Download failed: {str(e)}")
     except subprocess.TimeoutExpired:
+        shutil.rmtree(tmpdir, ignore_errors=True)
         raise HTTPException(status_code=500, detail="Video processing timeout")
     except Exception as e:
+        shutil.rmtree(tmpdir, ignore_errors=True)
         raise HTTPException(status_code=500, detail=f"Processing error: {str(e)}")
 
 @app.get("/health")
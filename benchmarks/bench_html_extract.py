@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the ingest_urls.py HTML extractors.
+
+Runs every extractor (with and without --main-content) over saved HTML
+fixtures and reports parse time and markdown size. The first row (bs4,
+full page) is the original fetch_url path.
+
+Usage:
+  pip install requests beautifulsoup4 rich lxml
+  python benchmarks/bench_html_extract.py
+  python benchmarks/bench_html_extract.py --repeat 50 saved_page.html
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+from typing import List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ingest_urls import EXTRACTORS, html_to_markdown  # noqa: E402
+
+FIXTURES = os.path.join(ROOT, "benchmarks", "fixtures", "*.html")
+
+
+def bench(path: str, extractor: str, main_content: bool, repeat: int) -> List[float]:
+    with open(path, encoding="utf-8") as fh:
+        html = fh.read()
+    url = f"file://{os.path.abspath(path)}"
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        _, markdown = html_to_markdown(url, html, extractor, main_content)
+        timings.append(time.perf_counter() - started)
+    return timings + [len(markdown.encode("utf-8"))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare HTML-to-text extractors.")
+    parser.add_argument("paths", nargs="*", help="HTML files (default: benchmarks/fixtures).")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per extractor and file.")
+    args = parser.parse_args()
+
+    paths = args.paths or sorted(glob.glob(FIXTURES))
+    header = f"{'fixture':<22} {'extractor':<9} {'mode':<5} {'median ms':>10} {'speedup':>8} {'bytes':>9} {'size':>6}"
+    print(header)
+    print("-" * len(header))
+    for path in paths:
+        html_bytes = os.path.getsize(path)
+        baseline_ms = baseline_bytes = None
+        for main_content in (False, True):
+            for extractor in EXTRACTORS:
+                try:
+                    *timings, size = bench(path, extractor, main_content, args.repeat)
+                except ImportError as exc:
+                    print(f"{os.path.basename(path):<22} {extractor:<9} skipped ({exc})")
+                    continue
+                median_ms = statistics.median(timings) * 1000
+                if baseline_ms is None:
+                    baseline_ms, baseline_bytes = median_ms, size
+                mode = "main" if main_content else "full"
+                print(
+                    f"{os.path.basename(path):<22} {extractor:<9} {mode:<5} "
+                    f"{median_ms:>10.2f} {baseline_ms / median_ms:>7.1f}x "
+                    f"{size:>9,} {size / baseline_bytes:>6.0%}"
+                )
+        print(f"{'':<22} (input {html_bytes:,} bytes of HTML)\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for the API server and CLIs.
+
+Each entry point is imported in a fresh interpreter several times; the
+median wall time minus a bare ``python -c pass`` baseline is its import
+cost.  One extra ``-X importtime`` run lists the slowest top-level imports.
+With ``--check``, the run exits 1 if any entry point exceeds its budget in
+``benchmarks/startup_budget.json`` (milliseconds of import time).
+
+Usage:
+  python benchmarks/bench_startup.py
+  python benchmarks/bench_startup.py --runs 10 --check
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_PATH = os.path.join(ROOT, "benchmarks", "startup_budget.json")
+
+# name -> (directory to put on sys.path, module to import)
+ENTRY_POINTS: Dict[str, Tuple[str, str]] = {
+    "api_server": (ROOT, "api_server"),
+    "ingest_urls": (ROOT, "ingest_urls"),
+    "read_senso": (ROOT, "read_senso"),
+    "url_crawler": (ROOT, "url_crawler"),
+    "cli_tiktok_search": (os.path.join(ROOT, "tiktok-search"), "cli_tiktok_search"),
+    "cli_tiktok_repurpose": (os.path.join(ROOT, "tiktok-repurpose"), "cli_tiktok_repurpose"),
+}
+IMPORTTIME_RE = re.compile(r"import time:\s+\d+ \|\s+(\d+) \|( *)(\S+)")
+
+
+def timed_run(code: str, cwd: str) -> float:
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], cwd=cwd, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return (time.perf_counter() - started) * 1000
+
+
+def median_ms(code: str, cwd: str, runs: int) -> float:
+    return statistics.median(timed_run(code, cwd) for _ in range(runs))
+
+
+def top_imports(path: str, module: str, n: int) -> List[Tuple[str, int]]:
+    """Slowest imports (cumulative microseconds) directly under ``module``."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=path, capture_output=True, text=True, check=True,
+    )
+    rows: List[Tuple[str, int]] = []
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if not match:
+            continue
+        depth = len(match.group(2)) // 2
+        if depth == 0:
+            if match.group(3) == module:
+                break  # children are reported before their parent
+            rows = []  # e.g. what ``site`` pulled in
+        elif depth == 1:
+            rows.append((match.group(3), int(match.group(1))))
+    return sorted(rows, key=lambda r: -r[1])[:n]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure interpreter and import time per entry point.")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per entry point.")
+    parser.add_argument("--top", type=int, default=3, help="Slowest imports to list per entry point.")
+    parser.add_argument("--only", nargs="+", choices=sorted(ENTRY_POINTS), help="Entry points to measure.")
+    parser.add_argument("--budget", default=BUDGET_PATH, help="JSON of per-entry-point import budgets (ms).")
+    parser.add_argument("--check", action="store_true", help="Exit 1 if any entry point exceeds its budget.")
+    args = parser.parse_args()
+
+    with open(args.budget, encoding="utf-8") as fh:
+        budgets: Dict[str, float] = json.load(fh)
+
+    baseline = median_ms("pass", ROOT, args.runs)
+    print(f"interpreter baseline: {baseline:.0f} ms (median of {args.runs})")
+    header = f"{'entry point':<22} {'total ms':>9} {'import ms':>10} {'budget':>7}  slowest imports"
+    print(header)
+    print("-" * len(header))
+
+    over = []
+    for name in args.only or ENTRY_POINTS:
+        path, module = ENTRY_POINTS[name]
+        total = median_ms(f"import {module}", path, args.runs)
+        imports = max(total - baseline, 0.0)
+        budget = budgets.get(name)
+        slowest = ", ".join(f"{mod} {us / 1000:.0f}" for mod, us in top_imports(path, module, args.top))
+        flag = ""
+        if budget is not None and imports > budget:
+            over.append(name)
+            flag = " OVER"
+        budget_text = f"{budget:.0f}" if budget is not None else "-"
+        print(f"{name:<22} {total:>9.0f} {imports:>10.0f} {budget_text:>7}{flag}  {slowest}")
+
+    if args.check and over:
+        print(f"\nstartup budget exceeded: {', '.join(over)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the shared TikTok-to-markdown serializer (tiktok_markdown.py).
+
+Builds synthetic Apify-shaped datasets and, for each payload mode, reports
+serialization time, peak Python memory (tracemalloc, measured in a separate
+pass) and output size.  "legacy" is a verbatim copy of the search CLI's
+serializer from before tiktok_markdown.py; "pretty" (the default) produces
+the same document.  "stream" writes compact output straight to a file via
+``write_markdown``.
+
+Usage:
+  pip install orjson   # optional, used by the compact mode when present
+  python benchmarks/bench_tiktok_markdown.py
+  python benchmarks/bench_tiktok_markdown.py --sizes 10000 50000 100000 --fields text,videoMeta.duration
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import tiktok_markdown  # noqa: E402
+from tiktok_markdown import items_to_markdown, parse_fields, write_markdown  # noqa: E402
+
+
+def synthetic_items(n: int, seed: int = 7) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    words = "dance trend recipe ai tutorial comedy pets travel fitness music remix duet".split()
+    items = []
+    for i in range(n):
+        vid = str(7_300_000_000_000_000_000 + i)
+        items.append(
+            {
+                "id": vid,
+                "text": " ".join(rng.choices(words, k=rng.randint(5, 30))) + " 🎵",
+                "createTimeISO": f"2025-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}T12:00:00.000Z",
+                "authorMeta": {"name": f"user{i % 500}", "nickName": f"User {i % 500}",
+                               "profileUrl": f"https://www.tiktok.com/@user{i % 500}"},
+                "webVideoUrl": f"https://www.tiktok.com/@user{i % 500}/video/{vid}",
+                "diggCount": rng.randint(0, 10**6),
+                "commentCount": rng.randint(0, 10**4),
+                "shareCount": rng.randint(0, 10**4),
+                "playCount": rng.randint(0, 10**7),
+                "collectCount": rng.randint(0, 10**4),
+                "hashtags": [{"name": w} for w in rng.sample(words, 3)],
+                "musicMeta": {"musicName": "original sound", "musicAuthor": f"User {i % 500}"},
+                "videoMeta": {
+                    "coverUrl": f"https://p16-sign.tiktokcdn.com/obj/{vid}.jpeg?x-expires=1700000000",
+                    "duration": rng.randint(5, 180),
+                    "definition": "720p",
+                    "format": "mp4",
+                    "height": 1280,
+                    "width": 720,
+                    "downloadAddr": f"https://api.apify.com/v2/key-value-stores/abc/records/video-{vid}",
+                },
+                "mediaUrls": [f"https://api.apify.com/v2/key-value-stores/abc/records/video-{vid}"],
+            }
+        )
+    return items
+
+
+def legacy_markdown(descriptor: str, items: List[Dict[str, Any]]) -> str:
+    """The search CLI's ``items_to_markdown`` from before tiktok_markdown.py, unchanged."""
+    lines: List[str] = [f"# TikTok dataset for {descriptor}", ""]
+    structured: List[Dict[str, Any]] = []
+
+    for idx, item in enumerate(items, start=1):
+        video_id = item.get("id", "unknown")
+        caption = (item.get("text") or "").strip() or "<no caption>"
+        author = item.get("authorMeta", {}) or {}
+        author_name = author.get("nickName") or author.get("name") or "unknown author"
+        author_handle = author.get("name") or ""
+        published = item.get("createTimeISO") or str(item.get("createTime") or "unknown")
+        stats = {
+            "likes": item.get("diggCount"),
+            "comments": item.get("commentCount"),
+            "shares": item.get("shareCount"),
+            "plays": item.get("playCount"),
+            "collects": item.get("collectCount"),
+        }
+        hashtag_list = ", ".join(f"#{h.get('name')}" for h in item.get("hashtags", []) if h.get("name"))
+        video_url = item.get("webVideoUrl") or author.get("profileUrl")
+        video_meta = item.get("videoMeta") or {}
+        download_url = video_meta.get("downloadAddr")
+        media_urls = item.get("mediaUrls") or []
+
+        author_line = author_name if not author_handle else f"{author_name} (@{author_handle})"
+
+        lines.append(f"## Video {idx} — {video_id}")
+        lines.append(f"- Author: {author_line}")
+        lines.append(f"- Published: {published}")
+        lines.append(f"- TikTok URL: {video_url or 'n/a'}")
+        if download_url:
+            lines.append(f"- Download URL: {download_url}")
+        for media in media_urls:
+            if media:
+                lines.append(f"- Media URL: {media}")
+        lines.append(f"- Caption: {caption}")
+        if hashtag_list:
+            lines.append(f"- Hashtags: {hashtag_list}")
+        stat_parts = [f"{key}={value}" for key, value in stats.items() if isinstance(value, int)]
+        if stat_parts:
+            lines.append(f"- Stats: {', '.join(stat_parts)}")
+        music = item.get("musicMeta", {})
+        if music:
+            lines.append(
+                f"- Music: {music.get('musicName') or 'n/a'} by {music.get('musicAuthor') or 'unknown'}"
+            )
+        lines.append("")
+
+        structured.append(
+            {
+                "videoMeta.coverUrl": video_meta.get("coverUrl"),
+                "videoMeta.duration": video_meta.get("duration"),
+                "videoMeta.definition": video_meta.get("definition"),
+                "videoMeta.format": video_meta.get("format"),
+                "videoMeta.height": video_meta.get("height"),
+                "videoMeta.width": video_meta.get("width"),
+                "videoMeta.downloadAddr": download_url,
+                "mediaUrls": media_urls,
+                "text": caption,
+            }
+        )
+
+    if structured:
+        lines.append("### Structured Payload")
+        lines.append("```json")
+        lines.append(json.dumps(structured, indent=2))
+        lines.append("```")
+        lines.append("")
+
+    return "\n".join(lines).strip()
+
+
+def stream_to_file(descriptor: str, items: List[Dict[str, Any]], **options: Any) -> int:
+    with tempfile.TemporaryFile("w+", encoding="utf-8") as fh:
+        write_markdown(fh, descriptor, items, **options)
+        fh.flush()
+        return os.fstat(fh.fileno()).st_size
+
+
+def measure(fn: Callable[[], Any]) -> Dict[str, float]:
+    started = time.perf_counter()
+    out = fn()
+    elapsed = time.perf_counter() - started
+    size = out if isinstance(out, int) else len(out.encode("utf-8"))
+    del out
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": elapsed, "peak": peak, "bytes": size}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark TikTok markdown serialization.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--fields", help="Comma-separated payload fields (default: all).")
+    args = parser.parse_args()
+    fields = parse_fields(args.fields)
+
+    print(f"JSON encoder for compact mode: {'orjson' if tiktok_markdown.orjson else 'stdlib json'}")
+    header = f"{'items':>8} {'mode':<8} {'seconds':>8} {'speedup':>8} {'peak MB':>8} {'MB out':>8} {'size':>6}"
+    print(header)
+    print("-" * len(header))
+    for n in args.sizes:
+        items = synthetic_items(n)
+        modes = {
+            "legacy": lambda: legacy_markdown("Profile bench", items),
+            "pretty": lambda: items_to_markdown("Profile bench", items, payload="pretty", fields=fields),
+            "compact": lambda: items_to_markdown("Profile bench", items, payload="compact", fields=fields),
+            "none": lambda: items_to_markdown("Profile bench", items, payload="none"),
+            "stream": lambda: stream_to_file("Profile bench", items, payload="compact", fields=fields),
+        }
+        baseline = None
+        for mode, fn in modes.items():
+            result = measure(fn)
+            baseline = baseline or result
+            print(
+                f"{n:>8,} {mode:<8} {result['seconds']:>8.2f} "
+                f"{baseline['seconds'] / result['seconds']:>7.1f}x "
+                f"{result['peak'] / 1e6:>8.1f} {result['bytes'] / 1e6:>8.1f} "
+                f"{result['bytes'] / baseline['bytes']:>6.0%}"
+            )
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Split large markdown documents into bounded-size raw contents.
+
+Documents are cut at heading boundaries where possible, then at line
+boundaries, so each chunk stays under ``max_chars`` (plus a short part
+header).  Fenced code blocks that straddle a cut are closed and reopened so
+every chunk is valid markdown.  Everything is streamed: only the chunk being
+built and the chunks currently uploading are held in memory.
+"""
+
+from __future__ import annotations
+
+import io
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Union
+
+DEFAULT_CHUNK_CHARS = 200_000
+
+
+def _lines(source: Union[str, Iterable[str]]) -> Iterator[str]:
+    if isinstance(source, str):
+        source = io.StringIO(source)
+    for line in source:
+        yield line.rstrip("\n")
+
+
+def _sections(source: Union[str, Iterable[str]], max_chars: int) -> Iterator[str]:
+    """Yield heading-delimited sections, cutting any that exceed ``max_chars``."""
+    buf: List[str] = []
+    size = 0
+    fence = ""  # opening fence line while inside a code block
+    for line in _lines(source):
+        if not fence and line.startswith("#") and buf:
+            yield "\n".join(buf)
+            buf, size = [], 0
+        is_fence = line.lstrip().startswith("```")
+        limit = max(max_chars - len(fence) - 8, 1)
+        pieces = [line[i:i + limit] for i in range(0, len(line), limit)] or [""]
+        for piece in pieces:
+            if buf and size + len(piece) + 1 > limit:
+                yield "\n".join(buf + (["```"] if fence else []))
+                buf, size = ([fence], len(fence) + 1) if fence else ([], 0)
+            buf.append(piece)
+            size += len(piece) + 1
+        if is_fence:
+            fence = "" if fence else line.strip()
+    if buf:
+        yield "\n".join(buf)
+
+
+def split_markdown(
+    source: Union[str, Iterable[str]], max_chars: int = DEFAULT_CHUNK_CHARS
+) -> Iterator[str]:
+    """
+    Pack heading sections of ``source`` (a string or an iterable of lines)
+    into chunks of at most ~``max_chars`` characters.
+    """
+    chunk: List[str] = []
+    size = 0
+    for section in _sections(source, max_chars):
+        if chunk and size + len(section) + 1 > max_chars:
+            yield "\n".join(chunk).strip()
+            chunk, size = [], 0
+        chunk.append(section)
+        size += len(section) + 1
+    if chunk and "\n".join(chunk).strip():
+        yield "\n".join(chunk).strip()
+
+
+def part_title(title: str, index: int) -> str:
+    return f"{title} (part {index})"
+
+
+def upload_chunks(
+    title: str,
+    chunks: Iterable[str],
+    upload: Callable[[str, str], str],
+    workers: int = 4,
+) -> List[str]:
+    """
+    Upload chunks concurrently as ``"<title> (part N)"`` via ``upload(title,
+    text)`` and return their content IDs in part order.  At most
+    ``2 * workers`` chunks are in memory at once.  A lone chunk keeps the
+    plain ``title``.
+    """
+    iterator = iter(chunks)
+    first = next(iterator, None)
+    if first is None:
+        return []
+    second = next(iterator, None)
+    if second is None:
+        return [upload(title, first)]
+
+    slots = threading.BoundedSemaphore(2 * workers)
+
+    def send(index: int, text: str) -> str:
+        try:
+            name = part_title(title, index)
+            if index > 1:
+                text = f"# {name}\n\n{text}"
+            return upload(name, text)
+        finally:
+            slots.release()
+
+    futures = []
+    with ThreadPoolExecutor(workers) as pool:
+        for index, text in enumerate(itertools.chain([first, second], iterator), start=1):
+            slots.acquire()
+            futures.append(pool.submit(send, index, text))
+    return [future.result() for future in futures]
@@ -0,0 +1,83 @@
+"""
+Persistent cache for Senso ``/generate`` results.
+
+Entries are keyed on the dataset the asset was generated from (a content
+hash of its videos) plus the request that shaped it (content_type,
+instructions, max_results), and store the generated text and the saved
+content_id.  Re-running a repurpose job on an unchanged dataset reuses them
+instead of paying generation latency and saving duplicate assets.  The
+dataset hash is whatever the caller passes; the repurposer hashes video
+IDs and captions only, so changed play/like counts do not invalidate
+entries.  Report ``age()`` of every hit so stale text is visible.
+
+Usage:
+  cache = GenerateCache("generate_cache.json", ttl=7 * 86400)
+  key = cache_key(dataset_hash(video_ids_and_captions), "marketing asset", instructions, 5)
+  hit = cache.get(key)             # None if missing or older than ttl
+  cache.put(key, content_id=..., generated_text=...)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+from typing import Any, Dict, Optional
+
+from json_store import JsonStore
+
+DEFAULT_TTL = 7 * 24 * 3600  # seconds
+
+
+def dataset_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def age(created_at: float) -> str:
+    """How long ago ``created_at`` was, e.g. ``"3h 12m"`` or ``"2d 4h"``."""
+    seconds = max(0, int(time.time() - created_at))
+    days, rest = divmod(seconds, 86400)
+    hours, rest = divmod(rest, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if days:
+        return f"{days}d {hours}h"
+    if hours:
+        return f"{hours}h {minutes}m"
+    return f"{minutes}m" if minutes else f"{seconds}s"
+
+
+def cache_key(dataset: str, content_type: str, instructions: str, max_results: int) -> str:
+    request = json.dumps([dataset, content_type, instructions, max_results])
+    return hashlib.sha256(request.encode("utf-8")).hexdigest()
+
+
+class GenerateCache(JsonStore):
+    """
+    JSON file of generated assets. Entries older than ``ttl`` seconds
+    (``None`` = never expire) read as misses.
+    """
+
+    def __init__(self, path: str, ttl: Optional[float] = DEFAULT_TTL) -> None:
+        super().__init__(path)
+        self.ttl = ttl
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if not entry:
+                return None
+            if self.ttl is not None and time.time() - entry["created_at"] > self.ttl:
+                return None
+            return dict(entry)
+
+    def put(self, key: str, **fields: Any) -> None:
+        with self.lock:
+            self.entries[key] = {**fields, "created_at": time.time()}
+            self._prune()
+            self.save()
+
+    def _prune(self) -> None:
+        if self.ttl is None:
+            return
+        cutoff = time.time() - self.ttl
+        self.entries = {k: v for k, v in self.entries.items() if v["created_at"] >= cutoff}
@@ -5,37 +5,202 @@ Simple URL ingestion helper.
 Usage:
   export SENSO_KEY="sk_prod_xxx"
   python ingest_urls.py https://docs.senso.ai/introduction https://example.com
+  python ingest_urls.py --pipeline --url-file urls.txt --report ingest_report.json
+  python ingest_urls.py --manifest ingest_manifest.json --url-file urls.txt   # skips unchanged pages
+  python ingest_urls.py --crawl https://docs.senso.ai/ --max-depth 2 --pipeline
+  python ingest_urls.py --sitemap https://docs.senso.ai/sitemap.xml --dry-run
+  python ingest_urls.py --local-index docs_index.npz https://docs.senso.ai/introduction
 """
 
 from __future__ import annotations
 
 import argparse
+import hashlib
+import json
 import os
+import re
 import sys
+import threading
 import time
-from typing import List, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
 import requests
-from bs4 import BeautifulSoup
 from rich.console import Console
 
+from chunking import part_title, split_markdown, upload_chunks
+from json_store import JsonStore
+from senso_poller import IndexTimeout, StatusPoller, wait_for_indexing
+from url_crawler import add_crawl_arguments, crawler_from_args
+
 SENSO_API = "https://sdk.senso.ai/api/v1"
 
 console = Console()
 
 
-def fetch_url(url: str, timeout: int = 60) -> Tuple[str, str]:
+def download_html(url: str, timeout: int = 60) -> str:
     resp = requests.get(url, timeout=timeout)
     resp.raise_for_status()
-    soup = BeautifulSoup(resp.text, "html.parser")
-    for tag in soup(["script", "style", "noscript"]):
+    return resp.text
+
+
+def download_html_conditional(
+    url: str, entry: Optional[Dict[str, Any]] = None, timeout: int = 60
+) -> Tuple[Optional[str], Dict[str, str]]:
+    """
+    GET ``url`` with If-None-Match / If-Modified-Since taken from a manifest
+    entry. Returns ``(None, validators)`` when the server answers 304.
+    """
+    headers = {}
+    if entry and entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry and entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    resp = requests.get(url, headers=headers, timeout=timeout)
+    resp.raise_for_status()
+    validators = {
+        "etag": resp.headers.get("ETag") or (entry or {}).get("etag", ""),
+        "last_modified": resp.headers.get("Last-Modified") or (entry or {}).get("last_modified", ""),
+    }
+    if resp.status_code == 304:
+        return None, validators
+    return resp.text, validators
+
+
+def fetch_page(
+    url: str, entry: Optional[Dict[str, Any]] = None, pages: Optional[Dict[str, str]] = None
+) -> Tuple[Optional[str], Dict[str, str]]:
+    """
+    Like ``download_html_conditional``, but serve HTML the crawler already
+    downloaded from ``pages`` (taking it out, so it is freed once parsed).
+    Such pages keep the manifest entry's validators.
+    """
+    html = pages.pop(url, None) if pages else None
+    if html is None:
+        return download_html_conditional(url, entry)
+    entry = entry or {}
+    return html, {"etag": entry.get("etag", ""), "last_modified": entry.get("last_modified", "")}
+
+
+def text_hash(markdown: str) -> str:
+    """Hash of the whitespace-normalized markdown, stable across cosmetic reflows."""
+    return hashlib.sha256(" ".join(markdown.split()).encode("utf-8")).hexdigest()
+
+
+class Manifest(JsonStore):
+    """Per-URL record of what was last ingested: HTTP validators, text hash and Senso content_id."""
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            entry = self.entries.get(url)
+            return dict(entry) if entry else None
+
+    def update(self, url: str, **fields: Any) -> None:
+        with self.lock:
+            self.entries.setdefault(url, {}).update(fields, checked_at=time.strftime("%Y-%m-%dT%H:%M:%S"))
+            self.save()
+
+
+NOISE_TAGS = ["script", "style", "noscript"]
+BOILERPLATE_TAGS = ["nav", "header", "footer", "aside", "form", "iframe", "svg"]
+BOILERPLATE_ROLES = ["navigation", "banner", "contentinfo", "complementary", "search"]
+XML_DECLARATION_RE = re.compile(r"^\s*<\?xml[^>]*\?>")
+
+
+def _tidy_lines(lines: Iterable[str]) -> str:
+    """Strip lines, drop blanks and collapse consecutive duplicates."""
+    out: List[str] = []
+    for line in lines:
+        line = " ".join(line.split())
+        if line and (not out or out[-1] != line):
+            out.append(line)
+    return "\n".join(out)
+
+
+def _extract_bs4(html: str, main_content: bool, parser: str) -> Tuple[str, str]:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, parser)
+    for tag in soup(NOISE_TAGS):
+        tag.decompose()
+    title = soup.title.string.strip() if soup.title and soup.title.string else ""
+    if not main_content:
+        return title, soup.get_text(separator="\n", strip=True)
+
+    for tag in soup(BOILERPLATE_TAGS):
         tag.decompose()
-    title = soup.title.string.strip() if soup.title and soup.title.string else url
-    body = soup.get_text(separator="\n", strip=True)
+    for tag in soup.find_all(attrs={"role": BOILERPLATE_ROLES}):
+        tag.decompose()
+    root = (
+        soup.find("main")
+        or soup.find("article")
+        or soup.find(attrs={"role": "main"})
+        or soup.body
+        or soup
+    )
+    return title, _tidy_lines(root.get_text(separator="\n").splitlines())
+
+
+def _extract_lxml(html: str, main_content: bool) -> Tuple[str, str]:
+    import lxml.etree
+    import lxml.html
+
+    # lxml rejects str input that carries an <?xml ... encoding=...?> declaration
+    # (XHTML); the text is already decoded, so the declaration can go.
+    html = XML_DECLARATION_RE.sub("", html, count=1)
+    try:
+        doc = lxml.html.document_fromstring(html)
+    except lxml.etree.ParserError:  # "Document is empty"
+        return "", ""
+    title_el = doc.find(".//title")
+    title = title_el.text_content().strip() if title_el is not None else ""
+
+    drop = NOISE_TAGS + BOILERPLATE_TAGS if main_content else NOISE_TAGS
+    for el in list(doc.iter(*drop)):
+        el.drop_tree()
+    if not main_content:
+        return title, "\n".join(t.strip() for t in doc.itertext() if t.strip())
+
+    roles = " or ".join(f'@role="{role}"' for role in BOILERPLATE_ROLES)
+    for el in doc.xpath(f"//*[{roles}]"):
+        el.drop_tree()
+    candidates = doc.xpath('//main | //article | //*[@role="main"]')
+    body = doc.find("body")
+    root = candidates[0] if candidates else (body if body is not None else doc)
+    return title, _tidy_lines(root.itertext())
+
+
+# name -> (html, main_content) -> (title, text)
+EXTRACTORS: Dict[str, Callable[[str, bool], Tuple[str, str]]] = {
+    "bs4": lambda html, main: _extract_bs4(html, main, "html.parser"),
+    "bs4-lxml": lambda html, main: _extract_bs4(html, main, "lxml"),
+    "lxml": _extract_lxml,
+}
+
+
+def html_to_markdown(
+    url: str, html: str, extractor: str = "bs4", main_content: bool = False
+) -> Tuple[str, str]:
+    """
+    Convert a page to markdown for Senso.
+
+    ``extractor`` picks the parser: ``bs4`` (pure-Python ``html.parser``,
+    the default), ``bs4-lxml`` or ``lxml`` (C-backed, needs ``pip install
+    lxml``).  ``main_content`` keeps only ``<main>``/``<article>`` and drops
+    nav, header, footer and sidebar boilerplate.
+    """
+    title, body = EXTRACTORS[extractor](html, main_content)
+    title = title or url
     markdown = f"# {title}\n\nSource: {url}\n\n{body}"
     return title, markdown
 
 
+def fetch_url(
+    url: str, timeout: int = 60, extractor: str = "bs4", main_content: bool = False
+) -> Tuple[str, str]:
+    return html_to_markdown(url, download_html(url, timeout), extractor, main_content)
+
+
 def create_raw_content(title: str, text: str, senso_key: str) -> str:
     hdr = {"X-API-Key": senso_key, "Content-Type": "application/json"}
     resp = requests.post(
@@ -52,49 +217,557 @@ def create_raw_content(title: str, text: str, senso_key: str) -> str:
     return resp.json()["id"]
 
 
-def wait_until_indexed(content_id: str, senso_key: str, poll_seconds: int = 3) -> None:
-    hdr = {"X-API-Key": senso_key}
-    status = ""
-    with console.status(f"[cyan]Processing {content_id} …[/cyan]"):
-        while status not in ("completed", "failed"):
-            resp = requests.get(
-                f"{SENSO_API}/content/{content_id}",
-                headers=hdr,
-                timeout=30,
-            )
-            resp.raise_for_status()
-            status = resp.json()["processing_status"]
-            if status not in ("completed", "failed"):
-                time.sleep(poll_seconds)
-    if status == "failed":
-        raise RuntimeError(f"Senso indexing failed for {content_id}")
+def upsert_raw_content(
+    title: str, text: str, senso_key: str, content_id: Optional[str] = None
+) -> str:
+    """
+    Replace the text of an existing raw content in place, or create a new one
+    when there is no ``content_id`` or Senso no longer has it.
+    """
+    if not content_id:
+        return create_raw_content(title, text, senso_key)
+    hdr = {"X-API-Key": senso_key, "Content-Type": "application/json"}
+    resp = requests.put(
+        f"{SENSO_API}/content/raw/{content_id}",
+        headers=hdr,
+        json={
+            "title": title,
+            "text": text,
+            "summary": f"Ingested from {title}",
+        },
+        timeout=60,
+    )
+    if resp.status_code in (404, 405):
+        return create_raw_content(title, text, senso_key)
+    resp.raise_for_status()
+    return resp.json().get("id", content_id)
+
+
+def delete_content(content_id: str, senso_key: str) -> None:
+    """Delete a content from Senso (already gone is fine)."""
+    resp = requests.delete(
+        f"{SENSO_API}/content/{content_id}",
+        headers={"X-API-Key": senso_key},
+        timeout=30,
+    )
+    if resp.status_code != 404:
+        resp.raise_for_status()
+
+
+def wait_until_indexed(
+    content_ids: List[str], senso_key: str, timeout: Optional[float] = None
+) -> None:
+    with console.status(f"[cyan]Processing {', '.join(content_ids)} …[/cyan]"):
+        final = wait_for_indexing(content_ids, lambda cid: _get_status(cid, senso_key), timeout)
+    failed = [cid for cid, status in final.items() if status == "failed"]
+    if failed:
+        raise RuntimeError(f"Senso indexing failed for {', '.join(failed)}")
+
+
+def upload_document(
+    title: str,
+    markdown: str,
+    senso_key: str,
+    previous_ids: Optional[List[str]] = None,
+    chunk_chars: int = 0,
+    workers: int = 4,
+) -> List[str]:
+    """
+    Upload one page and return its content IDs.  With ``chunk_chars``, pages
+    longer than that are split at headings into parts uploaded in parallel.
+    The page's ``previous_ids`` are updated in place, paired by part number;
+    any left over (the page now has fewer parts) are left for
+    ``delete_stale`` once the new parts are indexed.
+    """
+    previous_ids = list(previous_ids or [])
+    reuse = {part_title(title, n): cid for n, cid in enumerate(previous_ids, start=1)}
+    if previous_ids:
+        reuse[title] = previous_ids[0]  # a single part keeps the plain title
+    if chunk_chars and len(markdown) > chunk_chars:
+        content_ids = upload_chunks(
+            title,
+            split_markdown(markdown, chunk_chars),
+            lambda name, text: upsert_raw_content(name, text, senso_key, reuse.get(name)),
+            workers,
+        )
+    else:
+        content_ids = [upsert_raw_content(title, markdown, senso_key, reuse.get(title))]
+    return content_ids
+
 
+def delete_stale(previous_ids: Optional[List[str]], content_ids: List[str], senso_key: str) -> None:
+    """
+    Delete the parts of ``previous_ids`` that ``content_ids`` no longer use.
+    Call only after ``content_ids`` are indexed, so searches never miss the page.
+    """
+    for stale in previous_ids or []:
+        if stale in content_ids:
+            continue
+        try:
+            delete_content(stale, senso_key)
+        except requests.RequestException as exc:
+            console.print(f":warning: Could not delete stale content {stale}: {exc}")
 
-def ingest_urls(urls: List[str], senso_key: str) -> None:
+
+def ingest_urls(
+    urls: List[str],
+    senso_key: str,
+    extractor: str = "bs4",
+    main_content: bool = False,
+    manifest: Optional[Manifest] = None,
+    chunk_chars: int = 0,
+    index_timeout: Optional[float] = None,
+    index: Optional[Any] = None,
+    pages: Optional[Dict[str, str]] = None,
+) -> None:
     for url in urls:
         console.print(f"\n[bold]Fetching:[/bold] {url}")
-        title, markdown = fetch_url(url)
+        entry = manifest.get(url) if manifest else None
+        html, validators = fetch_page(url, entry, pages)
+        if html is None:
+            manifest.update(url, **validators)
+            console.print(":fast_forward: Not modified (304); skipping")
+            continue
+        title, markdown = html_to_markdown(url, html, extractor, main_content)
+        digest = text_hash(markdown)
+        previous_ids = (entry or {}).get("content_ids", [])
+        if previous_ids and entry.get("text_hash") == digest:
+            manifest.update(url, **validators)
+            console.print(f":fast_forward: Text unchanged; keeping content {', '.join(previous_ids)}")
+            continue
         console.print(f"→ got {len(markdown):,} characters")
 
-        console.print("Uploading to Senso …")
-        content_id = create_raw_content(title, markdown, senso_key)
-        wait_until_indexed(content_id, senso_key)
-        console.print(f":white_check_mark: Ingested as content {content_id}")
+        console.print("Updating in Senso …" if previous_ids else "Uploading to Senso …")
+        content_ids = upload_document(title, markdown, senso_key, previous_ids, chunk_chars)
+        if len(content_ids) > 1:
+            console.print(f"→ split into {len(content_ids)} parts")
+        wait_until_indexed(content_ids, senso_key, index_timeout)
+        delete_stale(previous_ids, content_ids, senso_key)
+        if manifest:
+            manifest.update(url, title=title, text_hash=digest, content_ids=content_ids, **validators)
+        if index is not None:
+            index.add(url, title, markdown, content_ids)
+        console.print(f":white_check_mark: Ingested as content {', '.join(content_ids)}")
+
+
+def _get_status(content_id: str, senso_key: str) -> str:
+    resp = requests.get(
+        f"{SENSO_API}/content/{content_id}",
+        headers={"X-API-Key": senso_key},
+        timeout=30,
+    )
+    resp.raise_for_status()
+    return resp.json()["processing_status"]
+
+
+def ingest_urls_pipelined(
+    urls: List[str],
+    senso_key: str,
+    fetch_workers: int = 8,
+    parse_workers: Optional[int] = None,
+    upload_workers: int = 4,
+    max_in_flight: int = 32,
+    index_timeout: Optional[float] = None,
+    extractor: str = "bs4",
+    main_content: bool = False,
+    manifest: Optional[Manifest] = None,
+    chunk_chars: int = 0,
+    index: Optional[Any] = None,
+    pages: Optional[Dict[str, str]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Fetch, parse, upload and index URLs as overlapping stages.
+
+    Fetches and uploads run on thread pools, HTML parsing runs on a process
+    pool, and indexing status is tracked by one shared ``StatusPoller``.  URLs
+    still indexing after ``index_timeout`` seconds past the last upload are
+    reported as failed.  At most
+    ``max_in_flight`` URLs hold downloaded HTML or markdown in memory at once.
+    With a ``manifest``, pages that answer 304 or whose text hash is unchanged
+    finish as ``unchanged`` without being uploaded.  With ``chunk_chars``,
+    long pages are uploaded as several parts and finish once all are indexed.
+    Uploaded markdown is also added to the offline ``index`` (a
+    ``local_index.LocalIndex``) when one is given.  URLs found in ``pages``
+    (HTML kept by the crawler) are not downloaded again.
+    Returns one result dict per URL, in input order.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    from rich.progress import BarColumn, MofNCompleteColumn, Progress, TextColumn, TimeElapsedColumn
+
+    results: Dict[str, Dict[str, Any]] = {
+        url: {"url": url, "status": "queued", "title": "", "chars": 0,
+              "content_ids": [], "error": "", "timings": {}}
+        for url in urls
+    }
+    lock = threading.Lock()
+    all_done = threading.Condition(lock)
+    slots = threading.BoundedSemaphore(max_in_flight)
+    indexing: Dict[str, Tuple[str, float]] = {}  # content_id -> (url, uploaded at)
+    parts_left: Dict[str, int] = {}
+    remaining = [len(results)]
+    uploads_left = [len(results)]
+    entries = {url: manifest.get(url) if manifest else None for url in results}
+    validators: Dict[str, Dict[str, str]] = {}
+    digests: Dict[str, str] = {}
+    released: set = set()  # URLs whose in-flight slot was given back
+    settled: set = set()  # URLs that no longer count towards uploads_left
+
+    progress = Progress(
+        TextColumn("{task.description:<9}"),
+        BarColumn(),
+        MofNCompleteColumn(),
+        TimeElapsedColumn(),
+        console=console,
+    )
+    stages = {
+        name: progress.add_task(name, total=len(results))
+        for name in ("fetched", "parsed", "uploaded", "indexed")
+    }
+    totals = {name: len(results) for name in stages}
+
+    def finish(url: str, status: str, error: str = "") -> None:
+        with lock:
+            if results[url]["status"] in ("indexed", "unchanged", "failed"):
+                return
+            results[url]["status"] = status
+            results[url]["error"] = error
+            remaining[0] -= 1
+            all_done.notify_all()
+
+    def release(url: str) -> None:
+        with lock:
+            if url in released:
+                return
+            released.add(url)
+        slots.release()
+
+    def upload_settled(url: str) -> None:
+        with lock:
+            if url in settled:
+                return
+            settled.add(url)
+            uploads_left[0] -= 1
+            all_done.notify_all()
+
+    def fail(url: str, stage: str, exc: BaseException) -> None:
+        release(url)
+        finish(url, "failed", f"{stage}: {exc}")
+        upload_settled(url)
+
+    def guarded(stage: str, callback: Callable[..., None]) -> Callable[..., None]:
+        """
+        Future callbacks swallow exceptions, so route any raised inside one
+        (e.g. ``BrokenProcessPool`` from ``parse_pool.submit``) to ``fail``,
+        blamed on the ``stage`` the callback hands work to; otherwise its
+        slot and upload count would never be given back.
+        """
+        def run(url: str, *args: Any) -> None:
+            try:
+                callback(url, *args)
+            except Exception as exc:
+                fail(url, stage, exc)
+        return run
+
+    def skip_unchanged(url: str, later_stages: List[str]) -> None:
+        release(url)
+        upload_settled(url)
+        with lock:
+            for name in later_stages:
+                totals[name] -= 1
+                progress.update(stages[name], total=totals[name])
+        manifest.update(url, **validators[url])
+        results[url]["content_ids"] = entries[url].get("content_ids", [])
+        finish(url, "unchanged")
+
+    def timed(url: str, stage: str, fn, *args):
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            results[url]["timings"][stage] = round(time.perf_counter() - started, 3)
+
+    def on_fetched(url: str, fut: Future) -> None:
+        if fut.exception() is not None:
+            return fail(url, "fetch", fut.exception())
+        progress.advance(stages["fetched"])
+        html, validators[url] = fut.result()
+        if html is None:
+            return skip_unchanged(url, ["parsed", "uploaded", "indexed"])
+        parse_started = time.perf_counter()
+        parsed = parse_pool.submit(html_to_markdown, url, html, extractor, main_content)
+        parsed.add_done_callback(lambda f: guarded("upload", on_parsed)(url, f, parse_started))
+
+    def on_parsed(url: str, fut: Future, parse_started: float) -> None:
+        results[url]["timings"]["parse"] = round(time.perf_counter() - parse_started, 3)
+        if fut.exception() is not None:
+            return fail(url, "parse", fut.exception())
+        progress.advance(stages["parsed"])
+        title, markdown = fut.result()
+        results[url]["title"] = title
+        results[url]["chars"] = len(markdown)
+        digests[url] = text_hash(markdown)
+        entry = entries[url] or {}
+        if entry.get("content_ids") and entry.get("text_hash") == digests[url]:
+            return skip_unchanged(url, ["uploaded", "indexed"])
+        uploaded = upload_pool.submit(
+            timed, url, "upload", upload_document,
+            title, markdown, senso_key, entry.get("content_ids"), chunk_chars,
+        )
+        uploaded.add_done_callback(lambda f: guarded("index", on_uploaded)(url, f, markdown))
+
+    def on_uploaded(url: str, fut: Future, markdown: str) -> None:
+        if fut.exception() is not None:
+            return fail(url, "upload", fut.exception())
+        release(url)
+        progress.advance(stages["uploaded"])
+        content_ids = fut.result()
+        with lock:
+            if index is not None:
+                index.add(url, results[url]["title"], markdown, content_ids)
+            results[url]["content_ids"] = content_ids
+            results[url]["status"] = "indexing"
+            parts_left[url] = len(content_ids)
+            for content_id in content_ids:
+                indexing[content_id] = (url, time.perf_counter())
+        for content_id in content_ids:
+            poller.track(content_id, on_done=on_indexed)
+        upload_settled(url)
+
+    def on_indexed(content_id: str, status: str) -> None:
+        with lock:
+            url, uploaded_at = indexing.pop(content_id)
+            parts_left[url] -= 1
+            if status == "completed" and parts_left[url]:
+                return
+        guarded("index", record_indexed)(url, content_id, status, uploaded_at)
+
+    def record_indexed(url: str, content_id: str, status: str, uploaded_at: float) -> None:
+        results[url]["timings"]["index"] = round(time.perf_counter() - uploaded_at, 3)
+        if status != "completed":
+            return finish(url, "failed", f"index: Senso indexing failed for {content_id}")
+        progress.advance(stages["indexed"])
+        if results[url]["status"] == "indexing":  # not already failed by the timeout
+            # the new parts are searchable, so surplus old parts can go now
+            previous_ids = (entries[url] or {}).get("content_ids")
+            upload_pool.submit(delete_stale, previous_ids, results[url]["content_ids"], senso_key)
+            if manifest:
+                manifest.update(
+                    url,
+                    title=results[url]["title"],
+                    text_hash=digests[url],
+                    content_ids=results[url]["content_ids"],
+                    **validators[url],
+                )
+        finish(url, "indexed")
+
+    started = time.perf_counter()
+    with progress, ThreadPoolExecutor(fetch_workers) as fetch_pool, \
+            ProcessPoolExecutor(parse_workers) as parse_pool, \
+            ThreadPoolExecutor(upload_workers) as upload_pool, \
+            StatusPoller(lambda cid: _get_status(cid, senso_key)) as poller:
+        for url in results:
+            slots.acquire()
+            fetched = fetch_pool.submit(timed, url, "fetch", fetch_page, url, entries[url], pages)
+            fetched.add_done_callback(lambda f, url=url: guarded("parse", on_fetched)(url, f))
+        with all_done:
+            all_done.wait_for(lambda: uploads_left[0] == 0)
+            pending = list(indexing)
+        try:
+            poller.wait(pending, timeout=index_timeout)
+        except IndexTimeout as exc:
+            for content_id in exc.pending:
+                url, _ = indexing.get(content_id, ("", 0.0))
+                if url:
+                    finish(url, "failed", f"index: timed out waiting for {content_id}")
+        with all_done:
+            all_done.wait_for(lambda: remaining[0] == 0)
+
+    report = list(results.values())
+    render_summary(report, time.perf_counter() - started)
+    return report
+
+
+def render_summary(report: List[Dict[str, Any]], elapsed: float) -> None:
+    from rich.table import Table
+
+    table = Table(title=f"Ingested {len(report)} URLs in {elapsed:.1f}s", header_style="bold magenta")
+    table.add_column("Status")
+    table.add_column("URL", overflow="fold")
+    table.add_column("Content ID", style="cyan")
+    table.add_column("Chars", justify="right")
+    table.add_column("Error", overflow="fold", style="red")
+    for row in report:
+        ids = row["content_ids"]
+        shown = ids[0] + (f" (+{len(ids) - 1} parts)" if len(ids) > 1 else "") if ids else ""
+        table.add_row(row["status"], row["url"], shown, f"{row['chars']:,}", row["error"])
+    console.print(table)
+
+    counts = {status: sum(1 for row in report if row["status"] == status)
+              for status in ("indexed", "unchanged", "failed")}
+    console.print(":white_check_mark: " + ", ".join(f"{n} {status}" for status, n in counts.items()))
+
+
+def read_url_file(path: str) -> List[str]:
+    with open(path, encoding="utf-8") as fh:
+        return [line.strip() for line in fh if line.strip() and not line.startswith("#")]
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(
         description="Ingest one or more URLs into Senso as raw content."
     )
-    parser.add_argument("urls", nargs="+", help="HTTP(S) URLs to fetch and ingest.")
+    parser.add_argument("urls", nargs="*", help="HTTP(S) URLs to fetch and ingest.")
+    parser.add_argument("--url-file", help="File with one URL per line (# comments allowed).")
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="Fetch, parse, upload and index URLs concurrently instead of one at a time.",
+    )
+    parser.add_argument(
+        "--extractor",
+        choices=sorted(EXTRACTORS),
+        default="bs4",
+        help="HTML parser backend; bs4-lxml and lxml are faster but need lxml (the 'fast' extra).",
+    )
+    parser.add_argument(
+        "--main-content",
+        action="store_true",
+        help="Keep only the main article text; drop nav, header, footer and sidebars.",
+    )
+    parser.add_argument(
+        "--crawl",
+        action="store_true",
+        help="Treat the URLs as crawl seeds and follow same-site links (see --max-depth).",
+    )
+    add_crawl_arguments(parser)
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Print the URLs that would be ingested and exit."
+    )
+    parser.add_argument(
+        "--manifest",
+        help="JSON manifest of previous ingests; unchanged pages are skipped and changed ones updated in place.",
+    )
+    parser.add_argument(
+        "--chunk-chars",
+        type=int,
+        default=0,
+        help="Split pages longer than this many characters into parts at heading boundaries.",
+    )
+    parser.add_argument(
+        "--local-index",
+        metavar="PATH",
+        help="Also add ingested pages to this offline BM25 index (needs numpy); "
+        "query it with read_senso.py --local-index.",
+    )
+    parser.add_argument(
+        "--index-timeout",
+        type=float,
+        default=None,
+        help="Give up on Senso indexing after this many seconds (default: wait forever).",
+    )
+    parser.add_argument("--fetch-workers", type=int, default=8, help="Concurrent page downloads.")
+    parser.add_argument(
+        "--parse-workers", type=int, default=None, help="HTML parser processes (default: CPU count)."
+    )
+    parser.add_argument("--upload-workers", type=int, default=4, help="Concurrent Senso uploads.")
+    parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=32,
+        help="Max URLs downloaded but not yet uploaded (bounds memory).",
+    )
+    parser.add_argument(
+        "--report",
+        default="ingest_report.json",
+        help="Where --pipeline writes the per-URL result report.",
+    )
     args = parser.parse_args()
 
+    if args.extractor != "bs4":
+        try:
+            import lxml  # noqa: F401
+        except ImportError:
+            parser.error(
+                f"--extractor {args.extractor} needs lxml: "
+                "pip install 'api-quickstart[fast]' (or pip install lxml)"
+            )
+
+    urls = list(args.urls)
+    pages: Dict[str, str] = {}
+    if args.url_file:
+        urls.extend(read_url_file(args.url_file))
+    if args.crawl or args.sitemap:
+        if not args.crawl:
+            args.max_depth = 0  # sitemap pages only; don't follow their links
+        crawler = crawler_from_args(args, keep_pages=not args.dry_run)
+        with console.status("[cyan]Crawling …[/cyan]"):
+            urls = crawler.crawl(urls, args.sitemap)
+        pages = crawler.pages  # HTML already downloaded while following links
+        console.print(f"→ discovered {len(urls)} URLs")
+    urls = list(dict.fromkeys(urls))
+    if not urls:
+        parser.error("provide at least one URL, --url-file or --sitemap")
+    if args.dry_run:
+        for url in urls:
+            print(url)
+        return
+
     senso_key = os.getenv("SENSO_KEY")
     if not senso_key:
         console.print(":warning:  Set SENSO_KEY env var first.")
         sys.exit(1)
 
-    ingest_urls(args.urls, senso_key)
+    manifest = Manifest(args.manifest) if args.manifest else None
+    index = None
+    if args.local_index:
+        try:
+            from local_index import LocalIndex
+        except ImportError as exc:
+            parser.error(str(exc))
+
+        index = LocalIndex.load(args.local_index)
+
+    if not args.pipeline:
+        try:
+            ingest_urls(
+                urls,
+                senso_key,
+                extractor=args.extractor,
+                main_content=args.main_content,
+                manifest=manifest,
+                chunk_chars=args.chunk_chars,
+                index_timeout=args.index_timeout,
+                index=index,
+                pages=pages,
+            )
+        finally:
+            if index is not None:
+                index.save(args.local_index)
+        return
+
+    report = ingest_urls_pipelined(
+        urls,
+        senso_key,
+        fetch_workers=args.fetch_workers,
+        parse_workers=args.parse_workers,
+        upload_workers=args.upload_workers,
+        max_in_flight=args.max_in_flight,
+        extractor=args.extractor,
+        main_content=args.main_content,
+        manifest=manifest,
+        chunk_chars=args.chunk_chars,
+        index_timeout=args.index_timeout,
+        index=index,
+        pages=pages,
+    )
+    if index is not None:
+        index.save(args.local_index)
+    with open(args.report, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2)
+    console.print(f"Report written to {args.report}")
+    if any(row["status"] == "failed" for row in report):
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,34 @@
+"""
+Small JSON-file stores for run state (manifests, caches, checkpoints).
+
+``JsonStore`` keeps a dict of entries in memory, guarded by ``lock``, and
+``save()`` writes the whole dict to a temporary file that is then
+``os.replace``-d over ``path``, so an interrupted run never leaves a
+half-written file and keeps everything saved before it stopped.
+Subclasses add their own typed accessors and call ``save()`` with
+``lock`` held after every change.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from typing import Any, Dict
+
+
+class JsonStore:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as fh:
+                self.entries = json.load(fh)
+
+    def save(self) -> None:
+        """Write ``entries`` atomically; call with ``lock`` held."""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            json.dump(self.entries, fh, indent=2)
+        os.replace(tmp_path, self.path)
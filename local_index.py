@@ -0,0 +1,201 @@
+"""
+Offline BM25 keyword index over the markdown we upload to Senso.
+
+Each ingested document is split into heading-aligned passages and indexed in
+a CSR-style postings matrix (one NumPy slice of passage ids and term
+frequencies per term), so a query costs a few vectorized array operations
+instead of a network round trip.  Hits use the same shape as Senso
+``/search`` results (``score``, ``title``, ``content_id``, ``chunk_text``),
+so existing renderers work unchanged.  Generative answers still need Senso.
+
+Requires NumPy (the ``index`` extra: ``pip install 'api-quickstart[index]'``).
+
+Usage:
+  index = LocalIndex.load("tiktok_index.npz")      # empty if missing
+  index.add("Profile tiktok", "Profile tiktok", markdown, [content_id])
+  index.save("tiktok_index.npz")
+  hits = index.search("dance challenge", k=5)
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import re
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    import numpy as np
+except ImportError as exc:
+    raise ImportError(
+        "--local-index needs NumPy: pip install 'api-quickstart[index]' (or pip install numpy)"
+    ) from exc
+
+from chunking import split_markdown
+
+TOKEN_RE = re.compile(r"[#@]?\w+", re.UNICODE)
+PASSAGE_CHARS = 800
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.lower())
+
+
+class LocalIndex:
+    def __init__(self, k1: float = 1.5, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self.docs: List[Dict[str, Any]] = []  # {"key", "title", "content_ids"}
+        self.passages: List[List[Any]] = []  # [doc index, text]
+        self._built = False
+
+    # ------------------------------------------------------------------ #
+    # Building                                                           #
+    # ------------------------------------------------------------------ #
+    def add(
+        self,
+        key: str,
+        title: str,
+        markdown: str,
+        content_ids: Iterable[str],
+        passage_chars: int = PASSAGE_CHARS,
+    ) -> None:
+        """Index ``markdown`` under ``key``, replacing any earlier version of it."""
+        self.remove(key)
+        doc = len(self.docs)
+        self.docs.append({"key": key, "title": title, "content_ids": list(content_ids)})
+        self.passages.extend([doc, text] for text in split_markdown(markdown, passage_chars))
+        self._built = False
+
+    def remove(self, key: str) -> None:
+        keep = [i for i, d in enumerate(self.docs) if d["key"] != key]
+        if len(keep) == len(self.docs):
+            return
+        remap = {old: new for new, old in enumerate(keep)}
+        self.docs = [self.docs[i] for i in keep]
+        self.passages = [[remap[d], t] for d, t in self.passages if d in remap]
+        self._built = False
+
+    def _build(self) -> None:
+        vocab: Dict[str, int] = {}
+        term_ids: List[int] = []
+        passage_ids: List[int] = []
+        freqs: List[int] = []
+        lengths = np.zeros(len(self.passages), dtype=np.float32)
+        for pid, (_, text) in enumerate(self.passages):
+            counts = Counter(tokenize(text))
+            lengths[pid] = sum(counts.values())
+            for term, n in counts.items():
+                term_ids.append(vocab.setdefault(term, len(vocab)))
+                passage_ids.append(pid)
+                freqs.append(n)
+
+        rows = np.asarray(term_ids, dtype=np.int64)
+        order = np.argsort(rows, kind="stable")
+        self.vocab = vocab
+        self.postings = np.asarray(passage_ids, dtype=np.int32)[order]
+        self.tfs = np.asarray(freqs, dtype=np.float32)[order]
+        self.indptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=len(vocab)), out=self.indptr[1:])
+
+        avg = float(lengths.mean()) if len(lengths) else 1.0
+        # k1 * (1 - b + b * |d| / avgdl), precomputed per passage
+        self.norms = self.k1 * (1 - self.b + self.b * lengths / max(avg, 1.0))
+        self.passage_docs = np.asarray([d for d, _ in self.passages], dtype=np.int32)
+        self._built = True
+
+    # ------------------------------------------------------------------ #
+    # Querying                                                           #
+    # ------------------------------------------------------------------ #
+    def scores(self, query: str) -> "np.ndarray":
+        """BM25 score of every passage for ``query``."""
+        if not self._built:
+            self._build()
+        n = len(self.passages)
+        scores = np.zeros(n, dtype=np.float32)
+        for term in set(tokenize(query)):
+            tid = self.vocab.get(term)
+            if tid is None:
+                continue
+            start, end = self.indptr[tid], self.indptr[tid + 1]
+            pids, tf = self.postings[start:end], self.tfs[start:end]
+            idf = math.log(1 + (n - (end - start) + 0.5) / ((end - start) + 0.5))
+            scores[pids] += idf * tf * (self.k1 + 1) / (tf + self.norms[pids])
+        return scores
+
+    def search(
+        self, query: str, k: int = 5, content_ids: Optional[Iterable[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Top ``k`` passages for ``query``, optionally restricted to documents
+        that own one of ``content_ids``.
+        """
+        k = max(0, min(k, len(self.passages)))
+        if k == 0:
+            return []
+        scores = self.scores(query)
+        if content_ids is not None:
+            wanted = set(content_ids)
+            allowed = np.asarray(
+                [bool(wanted.intersection(d["content_ids"])) for d in self.docs], dtype=bool
+            )
+            scores = np.where(allowed[self.passage_docs], scores, 0.0)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        hits = []
+        for pid in top:
+            if scores[pid] <= 0:
+                break
+            doc = self.docs[self.passage_docs[pid]]
+            hits.append(
+                {
+                    "score": float(scores[pid]),
+                    "title": doc["title"],
+                    "content_id": doc["content_ids"][0] if doc["content_ids"] else "",
+                    "content_ids": doc["content_ids"],
+                    "chunk_text": self.passages[pid][1],
+                }
+            )
+        return hits
+
+    # ------------------------------------------------------------------ #
+    # Persistence                                                        #
+    # ------------------------------------------------------------------ #
+    def save(self, path: str) -> None:
+        """Write passages and postings to one ``.npz`` file (atomically)."""
+        if not self._built:
+            self._build()
+        meta = {"k1": self.k1, "b": self.b, "docs": self.docs, "passages": self.passages,
+                "vocab": sorted(self.vocab, key=self.vocab.get)}
+        tmp_path = f"{path}.tmp.npz"
+        np.savez_compressed(
+            tmp_path,
+            meta=np.array(json.dumps(meta)),
+            indptr=self.indptr,
+            postings=self.postings,
+            tfs=self.tfs,
+            norms=self.norms,
+            passage_docs=self.passage_docs,
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "LocalIndex":
+        """Load an index saved by ``save``; returns an empty index if ``path`` is missing."""
+        if not os.path.exists(path):
+            return cls()
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            index = cls(meta["k1"], meta["b"])
+            index.docs = meta["docs"]
+            index.passages = meta["passages"]
+            index.vocab = {term: i for i, term in enumerate(meta["vocab"])}
+            for name in ("indptr", "postings", "tfs", "norms", "passage_docs"):
+                setattr(index, name, data[name])
+        index._built = True
+        return index
+
+    def __len__(self) -> int:
+        return len(self.passages)
@@ -7,20 +7,42 @@ Usage examples:
   python read_senso.py --content-id d4b0471a-03e3-48f4-88f5-cfcbeca48806
   python read_senso.py --search "What is the Senso SDK?"
   python read_senso.py --content-id d4b0471a-03e3-48f4-88f5-cfcbeca48806 --json
+  python read_senso.py --search "dance challenge" --local-index tiktok_index.npz
+  python read_senso.py --batch queries.txt --concurrency 16 > results.jsonl
+  cat queries.txt | python read_senso.py --batch - --output results.jsonl
+
+Batch files hold one request per line: a bare content ID, a plain search
+query, or a JSON object such as {"search": "...", "max_results": 5} or
+{"content_id": "..."}. Blank lines and lines starting with # are skipped;
+a malformed line is reported as an "invalid" record and the rest still run.
 """
 
 from __future__ import annotations
 
 import argparse
 import os
+import re
 import sys
-from typing import Any, Dict, List
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterable, List, Optional, TextIO, Tuple
 
 import json
 
 import requests
 
 SENSO_API = "https://sdk.senso.ai/api/v1"
+UUID_RE = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$", re.I)
+
+_local = threading.local()
+
+
+def _session() -> requests.Session:
+    """One keep-alive session per thread so batch requests reuse TLS connections."""
+    if not hasattr(_local, "session"):
+        _local.session = requests.Session()
+    return _local.session
 
 
 def require_api_key() -> str:
@@ -30,17 +52,23 @@ def require_api_key() -> str:
     return senso_key
 
 
-def fetch_content(content_id: str, senso_key: str) -> Dict[str, Any]:
+def fetch_content(
+    content_id: str, senso_key: str, session: Optional[requests.Session] = None
+) -> Dict[str, Any]:
     headers = {"X-API-Key": senso_key}
-    resp = requests.get(f"{SENSO_API}/content/{content_id}", headers=headers, timeout=30)
+    http = session or requests
+    resp = http.get(f"{SENSO_API}/content/{content_id}", headers=headers, timeout=30)
     resp.raise_for_status()
     return resp.json()
 
 
-def search(query: str, senso_key: str, max_results: int = 3) -> Dict[str, Any]:
+def search(
+    query: str, senso_key: str, max_results: int = 3, session: Optional[requests.Session] = None
+) -> Dict[str, Any]:
     headers = {"X-API-Key": senso_key, "Content-Type": "application/json"}
     payload = {"query": query, "max_results": max_results}
-    resp = requests.post(f"{SENSO_API}/search", headers=headers, json=payload, timeout=30)
+    http = session or requests
+    resp = http.post(f"{SENSO_API}/search", headers=headers, json=payload, timeout=30)
     resp.raise_for_status()
     return resp.json()
 
@@ -77,6 +105,116 @@ def render_search_results(results: List[Dict[str, Any]]) -> str:
     return "\n".join(lines)
 
 
+# (kind, value, max_results) -> line numbers it appeared on
+BatchKey = Tuple[str, str, int]
+
+
+def parse_request(line: str, default_max_results: int) -> BatchKey:
+    """Turn one batch line into a request key; raises ``ValueError`` if it is malformed."""
+    if not line.startswith("{"):
+        if UUID_RE.match(line):
+            return ("content", line.lower(), 0)
+        return ("search", " ".join(line.split()), default_max_results)
+    try:
+        obj = json.loads(line)
+    except json.JSONDecodeError as exc:
+        raise ValueError(f"invalid JSON: {exc}") from None
+    if not isinstance(obj, dict):
+        raise ValueError("expected a JSON object")
+    if obj.get("content_id"):
+        return ("content", str(obj["content_id"]).strip().lower(), 0)
+    query = obj.get("search") or obj.get("query")
+    if not isinstance(query, str) or not query.strip():
+        raise ValueError("expected a 'search' string or a 'content_id'")
+    try:
+        max_results = int(obj.get("max_results", default_max_results))
+    except (TypeError, ValueError):
+        raise ValueError(f"invalid max_results: {obj.get('max_results')!r}") from None
+    return ("search", " ".join(query.split()), max_results)
+
+
+def parse_batch(
+    lines: Iterable[str], default_max_results: int
+) -> Tuple[Dict[BatchKey, List[int]], List[Dict[str, Any]]]:
+    """
+    Parse batch lines into unique requests, remembering every line each came
+    from.  Malformed lines do not stop the batch; each becomes an error record.
+    """
+    requests_by_key: Dict[BatchKey, List[int]] = {}
+    errors: List[Dict[str, Any]] = []
+    for lineno, raw in enumerate(lines, start=1):
+        line = raw.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            key = parse_request(line, default_max_results)
+        except ValueError as exc:
+            errors.append({"type": "invalid", "ok": False, "error": str(exc), "lines": [lineno]})
+            continue
+        requests_by_key.setdefault(key, []).append(lineno)
+    return requests_by_key, errors
+
+
+def run_one(key: BatchKey, senso_key: str) -> Dict[str, Any]:
+    kind, value, max_results = key
+    record: Dict[str, Any] = {"type": kind, kind if kind == "search" else "content_id": value}
+    if kind == "search":
+        record["max_results"] = max_results
+    started = time.perf_counter()
+    try:
+        if kind == "search":
+            record["result"] = search(value, senso_key, max_results, session=_session())
+        else:
+            record["result"] = fetch_content(value, senso_key, session=_session())
+        record["ok"] = True
+    except requests.RequestException as exc:
+        record["ok"] = False
+        record["error"] = str(exc)
+    record["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return record
+
+
+def run_batch(
+    lines: Iterable[str],
+    senso_key: str,
+    out: TextIO,
+    concurrency: int = 8,
+    max_results: int = 3,
+) -> List[Dict[str, Any]]:
+    """
+    Run every unique request from ``lines`` with up to ``concurrency`` in
+    flight, writing one JSONL record per unique request as it completes.
+    Repeated requests run once; their line numbers are listed in ``lines``.
+    Malformed lines are written first, as ``"type": "invalid"`` records.
+    """
+    batch, records = parse_batch(lines, max_results)
+    for record in records:
+        out.write(json.dumps(record) + "\n")
+    out.flush()
+    with ThreadPoolExecutor(max(1, concurrency)) as pool:
+        futures = {pool.submit(run_one, key, senso_key): key for key in batch}
+        for future in as_completed(futures):
+            record = future.result()
+            record["lines"] = batch[futures[future]]
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+            records.append(record)
+    return records
+
+
+def summarize_batch(records: List[Dict[str, Any]], total_lines: int, elapsed: float) -> str:
+    import statistics
+
+    latencies = sorted(r["latency_ms"] for r in records if "latency_ms" in r)
+    failed = sum(1 for r in records if not r["ok"])
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else 0.0
+    return (
+        f"{len(records)} unique requests ({total_lines - len(records)} duplicates skipped), "
+        f"{failed} failed, {elapsed:.2f}s wall; "
+        f"latency p50={statistics.median(latencies) if latencies else 0.0:.0f}ms p95={p95:.0f}ms"
+    )
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(
         description="Read content from Senso via /content/{id} or /search."
@@ -85,13 +223,47 @@ def main() -> None:
     parser.add_argument("--search", help="Run a semantic search query.")
     parser.add_argument("--max-results", type=int, default=3, help="Limit search hits.")
     parser.add_argument("--json", action="store_true", help="Output full JSON payload.")
+    parser.add_argument(
+        "--local-index",
+        metavar="PATH",
+        help="Answer --search from this offline BM25 index (see local_index.py); "
+        "falls back to Senso when it has no hits.",
+    )
+    parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="Run many queries/content IDs from FILE ('-' for stdin) and stream JSONL results.",
+    )
+    parser.add_argument("--concurrency", type=int, default=8, help="Parallel requests in --batch mode.")
+    parser.add_argument("--output", help="Write --batch JSONL here instead of stdout.")
     args = parser.parse_args()
 
-    if not args.content_id and not args.search:
+    if not args.content_id and not args.search and not args.batch:
         parser.print_help()
         sys.exit(1)
 
-    senso_key = require_api_key()
+    # A --search answered from --local-index works offline, without SENSO_KEY.
+    offline = bool(args.local_index) and not args.content_id and not args.batch
+    senso_key = "" if offline else require_api_key()
+
+    if args.batch:
+        if args.batch == "-":
+            lines = sys.stdin.readlines()
+        else:
+            with open(args.batch, encoding="utf-8") as fh:
+                lines = fh.readlines()
+        out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+        started = time.perf_counter()
+        try:
+            records = run_batch(lines, senso_key, out, args.concurrency, args.max_results)
+        finally:
+            if args.output:
+                out.close()
+        total = sum(len(r["lines"]) for r in records)
+        print(summarize_batch(records, total, time.perf_counter() - started), file=sys.stderr)
+        if any(not r["ok"] for r in records):
+            sys.exit(1)
+        return
 
     if args.content_id:
         data = fetch_content(args.content_id, senso_key)
@@ -106,7 +278,19 @@ def main() -> None:
                 print(preview + ("…" if len(text) > 800 else ""))
 
     if args.search:
-        payload = search(args.search, senso_key, args.max_results)
+        payload = None
+        if args.local_index:
+            try:
+                from local_index import LocalIndex
+            except ImportError as exc:
+                parser.error(str(exc))
+
+            hits = LocalIndex.load(args.local_index).search(args.search, args.max_results)
+            if hits:
+                payload = {"answer": "<local keyword search; omit --local-index for a Senso answer>",
+                           "results": hits}
+        if payload is None:
+            payload = search(args.search, senso_key or require_api_key(), args.max_results)
         if args.json:
             print(json.dumps(payload, indent=2))
         else:
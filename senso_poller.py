@@ -0,0 +1,240 @@
+"""
+Track Senso indexing status for many content IDs at once.
+
+One background thread polls ``GET /content/{id}`` for every tracked ID on its
+own schedule: each item starts at ``initial`` seconds and backs off by
+``factor`` (up to ``max_interval``) every time it is still processing, with
+random jitter so uploads made together do not poll in lockstep.  Completions
+are delivered through per-item callbacks, ``as_completed()`` or ``wait()``,
+both of which accept an overall deadline; ``track_all()`` reports a group
+of IDs once, when all have completed or the first one fails.  An ID whose
+status request errors (or returns a non-string) ``max_errors`` times in a
+row is reported as ``failed``.  Callbacks run on the poller thread; one that
+raises is logged and does not stop polling for the other IDs.
+
+Usage:
+  with StatusPoller(lambda cid: get_status(cid, senso_key)) as poller:
+      for cid in content_ids:
+          poller.track(cid)
+      for cid, status in poller.as_completed(timeout=600):
+          print(cid, status)
+"""
+
+from __future__ import annotations
+
+import heapq
+import logging
+import random
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from tracing import retrying
+
+TERMINAL = ("completed", "failed")
+
+log = logging.getLogger(__name__)
+
+DoneCallback = Callable[[str, str], None]
+
+
+class IndexTimeout(TimeoutError):
+    def __init__(self, pending: List[str]) -> None:
+        super().__init__(f"Timed out waiting for Senso to index {', '.join(pending)}")
+        self.pending = pending
+
+
+class StatusPoller:
+    def __init__(
+        self,
+        get_status: Callable[[str], str],
+        initial: float = 1.0,
+        factor: float = 1.6,
+        max_interval: float = 20.0,
+        jitter: float = 0.25,
+        max_errors: int = 5,
+    ) -> None:
+        self.get_status = get_status
+        self.initial = initial
+        self.factor = factor
+        self.max_interval = max_interval
+        self.jitter = jitter
+        self.max_errors = max_errors
+
+        self.cond = threading.Condition()
+        self.schedule: List[Tuple[float, str]] = []  # heap of (next poll time, content_id)
+        self.intervals: Dict[str, float] = {}
+        self.callbacks: Dict[str, List[DoneCallback]] = {}
+        self.results: Dict[str, str] = {}
+        self.errors: Dict[str, int] = {}
+        self.polls = 0
+        self.thread: Optional[threading.Thread] = None
+        self.stopped = False
+
+    # ------------------------------------------------------------------ #
+    def __enter__(self) -> "StatusPoller":
+        self.start()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name="senso-poller", daemon=True)
+            self.thread.start()
+
+    def stop(self) -> None:
+        with self.cond:
+            self.stopped = True
+            self.cond.notify_all()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    # ------------------------------------------------------------------ #
+    def track(self, content_id: str, on_done: Optional[DoneCallback] = None) -> None:
+        """Start polling ``content_id``; ``on_done(content_id, status)`` fires once."""
+        with self.cond:
+            if content_id in self.results:
+                status = self.results[content_id]
+            else:
+                status = ""
+                if on_done:
+                    self.callbacks.setdefault(content_id, []).append(on_done)
+                if content_id not in self.intervals:
+                    self.intervals[content_id] = self.initial
+                    due = time.monotonic() + self._jittered(self.initial)
+                    heapq.heappush(self.schedule, (due, content_id))
+                    self.cond.notify_all()
+        if status and on_done:
+            on_done(content_id, status)
+
+    def track_all(self, content_ids: Iterable[str], on_done: DoneCallback) -> None:
+        """
+        Track a group of IDs (e.g. the parts of one document) and call
+        ``on_done(content_id, status)`` once: with the first ID that failed,
+        or with the last one to complete once every ID has completed.
+        """
+        left = set(content_ids)
+        lock = threading.Lock()
+
+        def on_item(content_id: str, status: str) -> None:
+            with lock:
+                if not left:
+                    return  # the group already finished
+                if status == "completed":
+                    left.discard(content_id)
+                    if left:
+                        return
+                else:
+                    left.clear()
+            on_done(content_id, status)
+
+        for content_id in list(left):
+            self.track(content_id, on_item)
+
+    def as_completed(
+        self, content_ids: Optional[Iterable[str]] = None, timeout: Optional[float] = None
+    ) -> Iterator[Tuple[str, str]]:
+        """
+        Yield ``(content_id, status)`` as each ID reaches completed/failed.
+        Defaults to every tracked ID; raises ``IndexTimeout`` at the deadline.
+        """
+        with self.cond:
+            if content_ids is None:
+                content_ids = list(self.results) + list(self.intervals)
+            wanted = list(dict.fromkeys(content_ids))
+        for content_id in wanted:
+            self.track(content_id)
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        pending = set(wanted)
+        while pending:
+            with self.cond:
+                done = [cid for cid in pending if cid in self.results]
+                if not done:
+                    remaining = deadline - time.monotonic() if deadline is not None else None
+                    if remaining is not None and remaining <= 0:
+                        raise IndexTimeout(sorted(pending))
+                    self.cond.wait(remaining)
+                    continue
+                finished = [(cid, self.results[cid]) for cid in done]
+            for cid, status in finished:
+                pending.discard(cid)
+                yield cid, status
+
+    def wait(
+        self, content_ids: Optional[Iterable[str]] = None, timeout: Optional[float] = None
+    ) -> Dict[str, str]:
+        """Block until every ID is completed/failed; returns the status per ID."""
+        return dict(self.as_completed(content_ids, timeout))
+
+    # ------------------------------------------------------------------ #
+    @staticmethod
+    def _notify(callback: DoneCallback, content_id: str, status: str) -> None:
+        # A failing consumer (disk full, index error) must not kill the
+        # poller thread and stall every other tracked ID.
+        try:
+            callback(content_id, status)
+        except Exception:
+            log.exception("on_done callback for %s failed", content_id)
+
+    def _jittered(self, interval: float) -> float:
+        return interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _run(self) -> None:
+        while True:
+            with self.cond:
+                while not self.stopped and not self.schedule:
+                    self.cond.wait()
+                if self.stopped:
+                    return
+                due, content_id = self.schedule[0]
+                delay = due - time.monotonic()
+                if delay > 0:
+                    self.cond.wait(delay)  # re-check: a sooner item may have been added
+                    continue
+                heapq.heappop(self.schedule)
+
+            try:
+                with retrying(content_id in self.errors):
+                    status = self.get_status(content_id)
+                if not isinstance(status, str):
+                    raise TypeError(f"get_status returned {status!r}")
+            except Exception:  # network hiccup: back off and retry a few times
+                self.errors[content_id] = self.errors.get(content_id, 0) + 1
+                status = "failed" if self.errors[content_id] >= self.max_errors else ""
+            else:
+                self.errors.pop(content_id, None)
+            self.polls += 1
+
+            if status in TERMINAL:
+                with self.cond:
+                    self.results[content_id] = status
+                    del self.intervals[content_id]
+                    callbacks = self.callbacks.pop(content_id, [])
+                    self.cond.notify_all()
+                for callback in callbacks:
+                    self._notify(callback, content_id, status)
+                continue
+
+            with self.cond:
+                interval = min(self.intervals[content_id] * self.factor, self.max_interval)
+                self.intervals[content_id] = interval
+                heapq.heappush(self.schedule, (time.monotonic() + self._jittered(interval), content_id))
+
+
+def wait_for_indexing(
+    content_ids: Iterable[str],
+    get_status: Callable[[str], str],
+    timeout: Optional[float] = None,
+    on_done: Optional[DoneCallback] = None,
+) -> Dict[str, str]:
+    """One-shot helper: poll ``content_ids`` together and return their final statuses."""
+    with StatusPoller(get_status) as poller:
+        final: Dict[str, str] = {}
+        for content_id, status in poller.as_completed(content_ids, timeout):
+            final[content_id] = status
+            if on_done:
+                on_done(content_id, status)
+        return final
@@ -0,0 +1,83 @@
+"""Size bounds of ``split_markdown`` and part naming/buffering of ``upload_chunks``."""
+
+import os
+import sys
+import threading
+import time
+from typing import Iterator, List
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from chunking import split_markdown, upload_chunks  # noqa: E402
+
+
+def sample_markdown() -> str:
+    lines: List[str] = []
+    for section in range(12):
+        lines.append(f"{'#' * (1 + section % 3)} Section {section}")
+        lines.extend(f"line {section}.{n} " + "word " * (n * 3) for n in range(8))
+        if section % 4 == 0:
+            lines += ["```python"] + [f"x = {n}" for n in range(30)] + ["```"]
+    lines.append("z" * 1000)  # one line longer than any chunk
+    return "\n".join(lines)
+
+
+def words(text: str) -> str:
+    return "".join(w for w in text.split() if not w.startswith("```"))
+
+
+@pytest.mark.parametrize("max_chars", [120, 300, 1000])
+def test_chunks_stay_within_max_chars(max_chars):
+    markdown = sample_markdown()
+    chunks = list(split_markdown(markdown, max_chars))
+    assert len(chunks) > 1
+    assert all(0 < len(chunk) <= max_chars for chunk in chunks)
+    for chunk in chunks:  # fences cut mid-block are closed and reopened
+        assert sum(line.startswith("```") for line in chunk.splitlines()) % 2 == 0
+    assert words("\n".join(chunks)) == words(markdown)  # nothing lost or reordered
+
+
+def test_small_document_is_one_chunk_and_lines_are_accepted():
+    markdown = "# Title\n\nshort body\n"
+    assert list(split_markdown(markdown, 1000)) == ["# Title\n\nshort body"]
+    assert list(split_markdown(iter(markdown.splitlines(True)), 1000)) == ["# Title\n\nshort body"]
+    assert list(split_markdown("\n\n", 1000)) == []
+
+
+def test_upload_chunks_names_parts_in_order():
+    uploads = {}
+
+    def upload(name: str, text: str) -> str:
+        uploads[name] = text
+        return f"id-{name}"
+
+    ids = upload_chunks("Doc", ["one", "two", "three"], upload, workers=2)
+    assert ids == ["id-Doc (part 1)", "id-Doc (part 2)", "id-Doc (part 3)"]
+    assert uploads["Doc (part 1)"] == "one"
+    assert uploads["Doc (part 3)"] == "# Doc (part 3)\n\nthree"
+    assert upload_chunks("Doc", ["only"], upload) == ["id-Doc"]
+    assert upload_chunks("Doc", [], upload) == []
+
+
+def test_upload_chunks_buffers_at_most_two_per_worker():
+    lock = threading.Lock()
+    produced, uploaded, peak = [0], [0], [0]
+
+    def chunks() -> Iterator[str]:
+        for n in range(40):
+            with lock:
+                produced[0] += 1
+                peak[0] = max(peak[0], produced[0] - uploaded[0])
+            yield f"chunk {n}"
+
+    def upload(name: str, text: str) -> str:
+        time.sleep(0.002)
+        with lock:
+            uploaded[0] += 1
+        return name
+
+    assert len(upload_chunks("Doc", chunks(), upload, workers=3)) == 40
+    assert peak[0] <= 2 * 3 + 1  # the semaphore's 2 * workers, plus the one being produced
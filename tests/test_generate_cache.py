@@ -0,0 +1,70 @@
+"""What the repurposer's ``/generate`` cache keys on, and how entries expire."""
+
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tiktok-repurpose"))
+
+from cli_tiktok_repurpose import items_hash, template_key  # noqa: E402
+from generate_cache import GenerateCache, age  # noqa: E402
+
+ITEMS = [
+    {"id": "1", "text": "Dance challenge ", "playCount": 10, "diggCount": 1},
+    {"id": "2", "text": "Cooking", "playCount": 5, "diggCount": 0},
+]
+SPEC = {"content_type": "tweet thread", "instructions": "Write a thread.", "max_results": 5}
+
+
+def test_items_hash_tracks_videos_and_captions_not_counters():
+    base = items_hash(ITEMS)
+    recounted = [{**item, "playCount": item["playCount"] * 10, "diggCount": 99} for item in ITEMS]
+    assert items_hash(recounted) == base
+    assert items_hash([{**ITEMS[0], "text": "Dance challenge"}, ITEMS[1]]) == base  # whitespace only
+    assert items_hash([{**ITEMS[0], "text": "New caption"}, ITEMS[1]]) != base
+    assert items_hash([ITEMS[0], {**ITEMS[1], "id": "3"}]) != base
+    assert items_hash(ITEMS[::-1]) != base
+    assert items_hash(ITEMS[:1]) != base
+
+
+def test_template_key_covers_every_request_field():
+    dataset = items_hash(ITEMS)
+    keys = {
+        template_key(dataset, SPEC),
+        template_key(items_hash(ITEMS[:1]), SPEC),
+        template_key(dataset, {**SPEC, "content_type": "email teaser"}),
+        template_key(dataset, {**SPEC, "instructions": "Write a shorter thread."}),
+        template_key(dataset, {**SPEC, "max_results": 3}),
+    }
+    assert len(keys) == 5
+    assert template_key(dataset, dict(SPEC)) == template_key(dataset, SPEC)
+
+
+def test_cache_persists_hits_and_expires_after_ttl(tmp_path):
+    path = str(tmp_path / "generate_cache.json")
+    cache = GenerateCache(path, ttl=60)
+    cache.put("fresh", content_id="c1", generated_text="hello")
+    cache.put("old", content_id="c2", generated_text="bye")
+    with cache.lock:
+        cache.entries["old"]["created_at"] -= 120
+        cache.save()
+
+    reloaded = GenerateCache(path, ttl=60)
+    assert reloaded.get("fresh")["generated_text"] == "hello"
+    assert reloaded.get("old") is None
+    assert reloaded.get("missing") is None
+    assert GenerateCache(path, ttl=None).get("old")["content_id"] == "c2"
+    reloaded.put("another", content_id="c3", generated_text="")
+    assert "old" not in GenerateCache(path).entries  # pruned on the next write
+
+
+def test_age_formats_largest_units():
+    now = time.time()
+    assert age(now) == "0s"
+    assert age(now - 59) == "59s"
+    assert age(now - 3 * 60 - 5) == "3m"
+    assert age(now - 3 * 3600 - 12 * 60) == "3h 12m"
+    assert age(now - 2 * 86400 - 4 * 3600) == "2d 4h"
+    assert age(now + 30) == "0s"  # clock skew never goes negative
@@ -0,0 +1,79 @@
+"""BM25 ranking, filtering and persistence of ``LocalIndex`` (skipped without NumPy)."""
+
+import math
+import os
+import sys
+from collections import Counter
+
+import pytest
+
+pytest.importorskip("numpy")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from local_index import LocalIndex, tokenize  # noqa: E402
+
+DOCS = {
+    "dance": "# Dance\n\nThe dance challenge went viral. Dance dance dance.",
+    "cooking": "# Cooking\n\nA pasta recipe with a short dance break.",
+    "travel": "# Travel\n\nBeaches, mountains and #travel tips.",
+}
+
+
+def build() -> LocalIndex:
+    index = LocalIndex()
+    for key, markdown in DOCS.items():
+        index.add(key, key.title(), markdown, [f"cid-{key}"])
+    return index
+
+
+def reference_bm25(query: str, k1: float = 1.5, b: float = 0.75):
+    """Textbook BM25 over whole documents (each sample doc is one passage)."""
+    counts = {key: Counter(tokenize(text)) for key, text in DOCS.items()}
+    avg = sum(sum(c.values()) for c in counts.values()) / len(counts)
+    scores = {}
+    for key, tf in counts.items():
+        length = sum(tf.values())
+        score = 0.0
+        for term in set(tokenize(query)):
+            df = sum(term in c for c in counts.values())
+            if not tf[term]:
+                continue
+            idf = math.log(1 + (len(counts) - df + 0.5) / (df + 0.5))
+            score += idf * tf[term] * (k1 + 1) / (tf[term] + k1 * (1 - b + b * length / avg))
+        scores[key] = score
+    return scores
+
+
+def test_ranking_matches_reference_bm25():
+    hits = build().search("dance challenge", k=5)
+    expected = reference_bm25("dance challenge")
+    assert [hit["content_id"] for hit in hits] == ["cid-dance", "cid-cooking"]  # no zero scores
+    for hit in hits:
+        assert hit["score"] == pytest.approx(expected[hit["title"].lower()], rel=1e-5)
+    assert set(hits[0]) >= {"score", "title", "content_id", "chunk_text"}
+
+
+def test_filter_by_content_ids_and_clamp_k():
+    index = build()
+    hits = index.search("dance", content_ids=["cid-cooking"])
+    assert [hit["content_id"] for hit in hits] == ["cid-cooking"]
+    assert index.search("dance", k=0) == []
+    assert index.search("dance", k=-1) == []
+    assert len(index.search("dance", k=100)) == 2
+    assert LocalIndex().search("dance") == []
+    assert index.search("#travel", k=1)[0]["content_id"] == "cid-travel"
+
+
+def test_readding_a_key_replaces_it_and_save_load_round_trips(tmp_path):
+    index = build()
+    index.add("dance", "Dance", "# Dance\n\nNothing to see here.", ["cid-new"])
+    assert index.search("challenge") == []
+    assert [h["content_id"] for h in index.search("nothing")] == ["cid-new"]
+    path = str(tmp_path / "index.npz")
+    index.save(path)
+    loaded = LocalIndex.load(path)
+    assert loaded.search("pasta") == index.search("pasta")
+    assert len(loaded) == len(index)
+    assert len(LocalIndex.load(str(tmp_path / "missing.npz"))) == 0
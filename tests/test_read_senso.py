@@ -0,0 +1,63 @@
+"""``read_senso --batch`` parsing, deduplication and invalid-line records, without the network."""
+
+import io
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import read_senso  # noqa: E402
+
+CID = "D4B0471A-03E3-48F4-88F5-CFCBECA48806"
+BATCH = [
+    "# comment, then a blank line",
+    "",
+    "What is   Senso?",
+    CID,
+    '{"search": "What is Senso?", "max_results": 3}',
+    '{"content_id": "%s"}' % CID,
+    '{"search": "broken"',
+    '{"search": ["not", "a", "string"]}',
+    '{"max_results": 2}',
+    '{"search": "x", "max_results": "many"}',
+    '{"query": "rate limits", "max_results": 5}',
+]
+
+
+def test_parse_batch_dedupes_and_reports_invalid_lines():
+    requests_by_key, errors = read_senso.parse_batch(BATCH, 3)
+    assert requests_by_key == {
+        ("search", "What is Senso?", 3): [3, 5],
+        ("content", CID.lower(), 0): [4, 6],
+        ("search", "rate limits", 5): [11],
+    }
+    assert [e["lines"] for e in errors] == [[7], [8], [9], [10]]
+    assert all(e["type"] == "invalid" and e["ok"] is False for e in errors)
+    assert errors[0]["error"].startswith("invalid JSON")
+    assert errors[3]["error"] == "invalid max_results: 'many'"
+
+
+def test_run_batch_writes_invalid_records_first_and_runs_the_rest(monkeypatch):
+    calls = []
+
+    def fake_search(query, senso_key, max_results, session=None):
+        calls.append(query)
+        return {"query": query, "results": []}
+
+    def fake_fetch(content_id, senso_key, session=None):
+        calls.append(content_id)
+        return {"id": content_id}
+
+    monkeypatch.setattr(read_senso, "search", fake_search)
+    monkeypatch.setattr(read_senso, "fetch_content", fake_fetch)
+    out = io.StringIO()
+    records = read_senso.run_batch(BATCH, "key", out, concurrency=2)
+    written = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert written == records
+    assert [r["type"] for r in written[:4]] == ["invalid"] * 4
+    assert sorted(calls) == sorted(["What is Senso?", CID.lower(), "rate limits"])
+    assert all(r["ok"] and "latency_ms" in r for r in written[4:])
+    summary = read_senso.summarize_batch(records, 9, 0.5)
+    assert summary.startswith("7 unique requests (2 duplicates skipped), 4 failed")
@@ -0,0 +1,104 @@
+"""Drive ``StatusPoller`` with scripted ``get_status`` functions and tiny intervals."""
+
+import os
+import sys
+import threading
+from typing import Dict, List
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from senso_poller import IndexTimeout, StatusPoller  # noqa: E402
+
+
+class ScriptedStatus:
+    """Answer each ID from its script (the last entry repeats); exceptions are raised."""
+
+    def __init__(self, scripts: Dict[str, List[object]]) -> None:
+        self.scripts = scripts
+        self.calls: Dict[str, int] = {}
+
+    def __call__(self, content_id: str) -> object:
+        n = self.calls.get(content_id, 0)
+        self.calls[content_id] = n + 1
+        script = self.scripts[content_id]
+        answer = script[min(n, len(script) - 1)]
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+
+def make_poller(get_status, **options) -> StatusPoller:
+    options = {"initial": 0.005, "factor": 2.0, "max_interval": 0.02, "jitter": 0.0, **options}
+    return StatusPoller(get_status, **options)
+
+
+def test_backoff_grows_by_factor_up_to_max_interval():
+    seen: List[float] = []
+    status = ScriptedStatus({"a": ["processing"] * 4 + ["completed"]})
+
+    def get_status(content_id: str) -> object:
+        seen.append(poller.intervals[content_id])
+        return status(content_id)
+
+    with make_poller(get_status) as poller:
+        poller.track("a")
+        assert poller.wait(timeout=5) == {"a": "completed"}
+    assert seen == [0.005, 0.01, 0.02, 0.02, 0.02]
+
+
+def test_repeated_errors_and_bad_statuses_fail_the_id():
+    status = ScriptedStatus({
+        "flaky": [ConnectionError("reset"), "processing", ConnectionError("reset"), "completed"],
+        "down": [ConnectionError("refused")],
+        "odd": [None],
+    })
+    with make_poller(status, max_errors=3) as poller:
+        final = poller.wait(["flaky", "down", "odd"], timeout=5)
+    assert final == {"flaky": "completed", "down": "failed", "odd": "failed"}
+    assert status.calls["down"] == 3 and status.calls["odd"] == 3
+
+
+def test_failing_callback_does_not_stop_other_ids():
+    done: List[str] = []
+    finished = threading.Event()
+
+    def broken(content_id: str, status: str) -> None:
+        raise OSError("disk full")
+
+    def record(content_id: str, status: str) -> None:
+        done.append(content_id)
+        finished.set()
+
+    status = ScriptedStatus({"a": ["completed"], "b": ["processing", "completed"]})
+    with make_poller(status) as poller:
+        poller.track("a", broken)
+        poller.track("b", record)
+        assert finished.wait(5)
+    assert done == ["b"]
+
+
+def test_wait_raises_index_timeout_with_pending_ids():
+    status = ScriptedStatus({"a": ["completed"], "b": ["processing"]})
+    with make_poller(status) as poller:
+        with pytest.raises(IndexTimeout) as caught:
+            poller.wait(["a", "b"], timeout=0.1)
+    assert caught.value.pending == ["b"]
+
+
+def test_track_all_reports_the_first_failure_once():
+    calls: List[tuple] = []
+    finished = threading.Event()
+
+    def on_done(content_id: str, status: str) -> None:
+        calls.append((content_id, status))
+        finished.set()
+
+    status = ScriptedStatus({"a": ["completed"], "b": ["failed"], "c": ["processing", "completed"]})
+    with make_poller(status) as poller:
+        poller.track_all(["a", "b", "c"], on_done)
+        poller.wait(["a", "b", "c"], timeout=5)
+        assert finished.wait(5)
+    assert calls == [("b", "failed")]
@@ -0,0 +1,87 @@
+"""Sharded uploads with ``upload_shards``: page handling and resuming from a ``ShardManifest``."""
+
+import os
+import sys
+import threading
+from typing import Any, Dict, List
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from tiktok_shards import ShardManifest, upload_shards  # noqa: E402
+
+
+def make_pages(*sizes: int) -> List[List[Dict[str, Any]]]:
+    pages, n = [], 0
+    for size in sizes:
+        pages.append([{"id": str(n + i), "text": f"video {n + i}"} for i in range(size)])
+        n += size
+    return pages
+
+
+class FakeDataset:
+    """Serve ``pages`` by shard index (then empty pages) and record what was fetched."""
+
+    def __init__(self, pages: List[List[Dict[str, Any]]]) -> None:
+        self.pages = pages
+        self.fetched: List[int] = []
+
+    def __call__(self, index: int) -> List[Dict[str, Any]]:
+        self.fetched.append(index)
+        return self.pages[index] if index < len(self.pages) else []
+
+
+class FakeUpload:
+    """Return ``id-<title>``; raise for titles in ``fail``."""
+
+    def __init__(self, fail: tuple = ()) -> None:
+        self.fail = fail
+        self.lock = threading.Lock()
+        self.titles: List[str] = []
+
+    def __call__(self, title: str, markdown: str) -> str:
+        if title in self.fail:
+            raise RuntimeError(f"upload of {title} failed")
+        with self.lock:
+            self.titles.append(title)
+        return f"id-{title}"
+
+
+def test_short_page_does_not_end_the_dataset(tmp_path):
+    dataset, upload = FakeDataset(make_pages(5, 3, 5)), FakeUpload()
+    manifest = ShardManifest(str(tmp_path / "shards.json"))
+    manifest.reset("key", run_id="run-1")
+    ids = upload_shards("key", "@tiktok", dataset, upload, manifest, shard_items=5, workers=2)
+    assert ids == ["id-@tiktok (shard 1)", "id-@tiktok (shard 2)", "id-@tiktok (shard 3)"]
+    assert dataset.fetched == [0, 1, 2, 3]
+    shards = manifest.get("key")["shards"]
+    assert [shards[str(i)]["items"] for i in range(3)] == [5, 3, 5]
+
+
+def test_rerun_resumes_from_the_first_missing_shard(tmp_path):
+    path = str(tmp_path / "shards.json")
+    manifest = ShardManifest(path)
+    manifest.reset("key", run_id="run-1")
+    pages = make_pages(4, 4, 4, 4)
+    with pytest.raises(RuntimeError):
+        upload_shards("key", "#dance", FakeDataset(pages), FakeUpload(fail=("#dance (shard 2)",)),
+                      manifest, shard_items=4, workers=1)
+    assert "1" not in manifest.get("key")["shards"]
+
+    dataset, upload = FakeDataset(pages), FakeUpload()
+    resumed = ShardManifest(path)  # as a new process would see it
+    ids = upload_shards("key", "#dance", dataset, upload, resumed, shard_items=4, workers=2)
+    assert ids == [f"id-#dance (shard {n})" for n in range(1, 5)]
+    assert 0 not in dataset.fetched and 1 in dataset.fetched
+    assert "#dance (shard 1)" not in upload.titles
+    assert sorted(resumed.get("key")["shards"]) == ["0", "1", "2", "3"]
+
+
+def test_mark_indexed_updates_the_matching_shard(tmp_path):
+    manifest = ShardManifest(str(tmp_path / "shards.json"))
+    manifest.reset("key", run_id="run-1")
+    upload_shards("key", "q", FakeDataset(make_pages(2)), FakeUpload(), manifest, shard_items=2)
+    manifest.mark_indexed("key", "id-q (shard 1)", "completed")
+    assert ShardManifest(manifest.path).get("key")["shards"]["0"]["status"] == "completed"
@@ -0,0 +1,78 @@
+"""Crawl the fixture site in benchmarks/fixtures/site through ``Crawler(fetch=...)``."""
+
+import os
+import sys
+from typing import List, Tuple
+from urllib.parse import urlsplit
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from url_crawler import Crawler  # noqa: E402
+
+SITE = os.path.join(ROOT, "benchmarks", "fixtures", "site")
+HOST = "http://fixtures.test"
+CONTENT_TYPES = {".html": "text/html", ".xml": "application/xml", ".txt": "text/plain"}
+
+
+class FixtureFetch:
+    """Serve ``SITE`` for ``HOST``; ``unreachable`` URLs raise like a dead server."""
+
+    def __init__(self, unreachable: Tuple[str, ...] = ()) -> None:
+        self.unreachable = unreachable
+        self.requested: List[str] = []
+
+    def __call__(self, url: str) -> Tuple[int, str, str]:
+        self.requested.append(url)
+        if url in self.unreachable:
+            raise requests.ConnectionError(f"cannot reach {url}")
+        parts = urlsplit(url)
+        path = os.path.join(SITE, parts.path.lstrip("/"))
+        if f"{parts.scheme}://{parts.netloc}" != HOST or not os.path.isfile(path):
+            return 404, "text/html", "not found"
+        with open(path, encoding="utf-8") as fh:
+            return 200, CONTENT_TYPES.get(os.path.splitext(path)[1], ""), fh.read()
+
+
+def make_crawler(fetch: FixtureFetch, **options) -> Crawler:
+    return Crawler(delay=0, fetch=fetch, **options)
+
+
+def test_crawl_follows_links_and_respects_robots():
+    found = make_crawler(FixtureFetch(), max_depth=3).crawl([f"{HOST}/index.html"])
+    assert found == [
+        f"{HOST}/index.html",
+        f"{HOST}/docs/quickstart.html",
+        f"{HOST}/docs/search.html",
+        f"{HOST}/docs/generate.html",
+    ]  # /private/ is disallowed, the nofollow link, off-site link and logo are skipped
+
+
+def test_max_depth_and_max_pages():
+    fetch = FixtureFetch()
+    assert make_crawler(fetch, max_depth=0).crawl([f"{HOST}/index.html"]) == [f"{HOST}/index.html"]
+    assert len(make_crawler(fetch, max_depth=3, max_pages=2).crawl([f"{HOST}/index.html"])) == 2
+
+
+def test_sitemap_index_seeds_pages():
+    found = make_crawler(FixtureFetch(), max_depth=0).crawl(sitemaps=[f"{HOST}/sitemap.xml"])
+    assert found == [f"{HOST}/index.html", f"{HOST}/docs/quickstart.html"]
+
+
+def test_unreachable_nested_sitemap_is_skipped():
+    fetch = FixtureFetch(unreachable=(f"{HOST}/sitemap-docs.xml",))
+    found = make_crawler(fetch, max_depth=3).crawl(
+        [f"{HOST}/index.html"], sitemaps=[f"{HOST}/sitemap.xml"]
+    )
+    assert f"{HOST}/sitemap-docs.xml" in fetch.requested
+    assert found[0] == f"{HOST}/index.html" and len(found) == 4
+
+
+def test_keep_pages_holds_visited_html():
+    fetch = FixtureFetch()
+    crawler = make_crawler(fetch, max_depth=1, keep_pages=True)
+    found = crawler.crawl([f"{HOST}/index.html"])
+    assert list(crawler.pages) == [f"{HOST}/index.html"]  # the last depth is listed, not fetched
+    assert fetch.requested.count(f"{HOST}/index.html") == 1 and len(found) == 3
@@ -8,19 +8,35 @@ USAGE
   export SENSO_KEY="sk_prod_xxx"
   export APIFY_TOKEN="apify_api_xxx"
   python cli_tiktok_repurpose.py --profile tiktok
+  python cli_tiktok_repurpose.py --profile tiktok --templates templates.example.json
+  python cli_tiktok_repurpose.py --profile tiktok --cache   # reuse unchanged assets
+  python cli_tiktok_repurpose.py --batch creators.txt --scrape-workers 4 --generate-workers 8
+  python cli_tiktok_repurpose.py --profile tiktok --trace   # stage timeline + summary
 """
 
 import argparse
 import json
 import os
+import re
 import sys
+import threading
 import time
-from typing import Any, Dict, List
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import requests
 from rich.console import Console
 from rich.table import Table
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from chunking import split_markdown, upload_chunks  # noqa: E402
+from generate_cache import GenerateCache, age, cache_key, dataset_hash  # noqa: E402
+from json_store import JsonStore  # noqa: E402
+from senso_poller import IndexTimeout, StatusPoller, wait_for_indexing  # noqa: E402
+from tiktok_markdown import PAYLOAD_MODES, items_to_markdown, parse_fields, write_markdown  # noqa: E402
+import tracing  # noqa: E402
+from tracing import span  # noqa: E402
+
 # --------------------------------------------------------------------------- #
 # Config                                                                      #
 # --------------------------------------------------------------------------- #
@@ -28,7 +44,20 @@ SENSO_API = "https://sdk.senso.ai/api/v1"
 APIFY_RUN_SYNC_ITEMS = (
     "https://api.apify.com/v2/acts/clockworks~tiktok-scraper/run-sync-get-dataset-items"
 )
-POLL_INTERVAL = 3  # seconds
+INDEX_TIMEOUT = 1800  # seconds
+GENERATE_TIMEOUT = 60  # seconds per /generate call
+DEFAULT_CONTENT_TYPE = "marketing asset"
+DEFAULT_TEMPLATES = {
+    "Tweet thread (10 tweets)": (
+        "Write a 10-tweet thread summarising the key ideas in an engaging tone."
+    ),
+    "LinkedIn post": (
+        "Write a LinkedIn post (≤ 2 200 chars) summarising the article for professionals."
+    ),
+    "Email teaser": (
+        "Write a short email teaser (subject + 3-sentence body) that drives readers to the full post."
+    ),
+}
 
 console = Console()
 
@@ -40,11 +69,13 @@ def run_apify_actor(
 ) -> List[Dict[str, Any]]:
     params = {"token": token}
     headers = {"Content-Type": "application/json"}
-    resp = requests.post(
-        APIFY_RUN_SYNC_ITEMS, params=params, json=actor_input, headers=headers, timeout=timeout
-    )
-    resp.raise_for_status()
-    data = resp.json()
+    with span("apify.run_sync", "apify") as info:
+        resp = requests.post(
+            APIFY_RUN_SYNC_ITEMS, params=params, json=actor_input, headers=headers, timeout=timeout
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        info["items"] = len(data) if isinstance(data, list) else 0
     if isinstance(data, dict) and data.get("error"):
         raise RuntimeError(f"Apify error: {data}")
     if not isinstance(data, list):
@@ -52,120 +83,527 @@ def run_apify_actor(
     return data
 
 
-def items_to_markdown(descriptor: str, items: List[Dict[str, Any]]) -> str:
-    lines: List[str] = [f"# TikTok dataset for {descriptor}", ""]
-    structured: List[Dict[str, Any]] = []
-
-    for idx, item in enumerate(items, start=1):
-        author = item.get("authorMeta", {}) or {}
-        author_name = author.get("nickName") or author.get("name") or "unknown author"
-        handle = author.get("name") or ""
-        caption = (item.get("text") or "").strip() or "<no caption>"
-        stats = {
-            "likes": item.get("diggCount"),
-            "comments": item.get("commentCount"),
-            "shares": item.get("shareCount"),
-            "plays": item.get("playCount"),
-        }
-        stat_text = ", ".join(f"{name}={value}" for name, value in stats.items() if isinstance(value, int))
-        video_url = item.get("webVideoUrl") or author.get("profileUrl") or "n/a"
-        video_meta = item.get("videoMeta") or {}
-        download_url = video_meta.get("downloadAddr")
-        media_urls = item.get("mediaUrls") or []
-        published = item.get("createTimeISO") or str(item.get("createTime") or "unknown")
-
-        lines.append(f"## Video {idx} — {item.get('id', 'unknown')}")
-        lines.append(f"- Author: {author_name} (@{handle})" if handle else f"- Author: {author_name}")
-        lines.append(f"- Published: {published}")
-        lines.append(f"- TikTok URL: {video_url}")
-        if download_url:
-            lines.append(f"- Download URL: {download_url}")
-        for media in media_urls:
-            if media:
-                lines.append(f"- Media URL: {media}")
-        if stat_text:
-            lines.append(f"- Stats: {stat_text}")
-        hashtags = ", ".join(f"#{h.get('name')}" for h in item.get("hashtags", []) if h.get("name"))
-        if hashtags:
-            lines.append(f"- Hashtags: {hashtags}")
-        lines.append("")
-        lines.append(caption)
-        lines.append("")
-
-        structured.append(
+def build_actor_input(field: str, value: str, results: int) -> Dict[str, Any]:
+    actor_input: Dict[str, Any] = {
+        field: [value],
+        "resultsPerPage": results,
+        "shouldDownloadVideos": True,
+        "shouldDownloadAvatars": False,
+        "shouldDownloadCovers": False,
+        "shouldDownloadMusicCovers": False,
+        "shouldDownloadSlideshowImages": False,
+        "shouldDownloadSubtitles": False,
+        "scrapeRelatedVideos": False,
+        "proxyCountryCode": "US",
+    }
+    if field == "profiles":
+        actor_input.update(
             {
-                "videoMeta.coverUrl": video_meta.get("coverUrl"),
-                "videoMeta.duration": video_meta.get("duration"),
-                "videoMeta.definition": video_meta.get("definition"),
-                "videoMeta.format": video_meta.get("format"),
-                "videoMeta.height": video_meta.get("height"),
-                "videoMeta.width": video_meta.get("width"),
-                "videoMeta.downloadAddr": download_url,
-                "mediaUrls": media_urls,
-                "text": caption,
+                "excludePinnedPosts": False,
+                "profileScrapeSections": ["videos"],
+                "profileSorting": "latest",
             }
         )
-
-    if structured:
-        lines.append("### Structured Payload")
-        lines.append("```json")
-        lines.append(json.dumps(structured, indent=2))
-        lines.append("```")
-        lines.append("")
-
-    return "\n".join(lines).strip()
+    return actor_input
+
+
+def items_hash(items: List[Dict[str, Any]]) -> str:
+    """
+    Cache identity of a dataset: what the assets are about (videos +
+    captions), not live counters like plays/likes that change every scrape.
+    Cached assets therefore keep the stats they were generated with; hits
+    are printed with their age, and --refresh regenerates them.
+    """
+    return dataset_hash(
+        "\n".join(f"{item.get('id')}\t{(item.get('text') or '').strip()}" for item in items)
+    )
 
 # --------------------------------------------------------------------------- #
 # Senso helpers                                                               #
 # --------------------------------------------------------------------------- #
 def post_raw(title: str, text: str, senso_key: str) -> str:
     hdr = {"X-API-Key": senso_key, "Content-Type": "application/json"}
-    resp = requests.post(
-        f"{SENSO_API}/content/raw",
-        headers=hdr,
-        json={
-            "title": title,
-            "text": text,
-            "summary": f"Blog import from {title}",
-        },
-        timeout=60,
-    )
-    resp.raise_for_status()
-    return resp.json()["id"]
+    with span("senso.upload", "upload", title=title, chars=len(text)):
+        resp = requests.post(
+            f"{SENSO_API}/content/raw",
+            headers=hdr,
+            json={
+                "title": title,
+                "text": text,
+                "summary": f"Blog import from {title}",
+            },
+            timeout=60,
+        )
+        resp.raise_for_status()
+        return resp.json()["id"]
+
+
+def upload_dataset(descriptor: str, markdown: str, senso_key: str, chunk_chars: int = 0) -> List[str]:
+    """Upload a dataset, as parallel heading-aligned parts when it exceeds ``chunk_chars``."""
+    if chunk_chars and len(markdown) > chunk_chars:
+        return upload_chunks(
+            descriptor,
+            split_markdown(markdown, chunk_chars),
+            lambda title, text: post_raw(title, text, senso_key),
+        )
+    return [post_raw(descriptor, markdown, senso_key)]
 
 
-def poll_status(content_id: str, senso_key: str) -> None:
+def get_status(content_id: str, senso_key: str) -> str:
     hdr = {"X-API-Key": senso_key}
-    status = ""
-    spinner = console.status(f"[cyan]Processing {content_id} …[/cyan]")
-    spinner.start()
-    while status not in ("completed", "failed"):
-        time.sleep(POLL_INTERVAL)
+    with span("senso.status", "index", content_id=content_id):
         r = requests.get(f"{SENSO_API}/content/{content_id}", headers=hdr, timeout=30)
         r.raise_for_status()
-        status = r.json()["processing_status"]
-    spinner.stop()
-    if status == "failed":
-        console.print(f":x: Ingestion failed for {content_id}")
+        return r.json()["processing_status"]
+
+
+def poll_status(content_ids: List[str], senso_key: str) -> None:
+    def report(content_id: str, status: str) -> None:
+        if status == "completed":
+            console.print(f":white_check_mark: Indexed (content_id = {content_id})")
+
+    try:
+        with console.status(f"[cyan]Processing {', '.join(content_ids)} …[/cyan]"), \
+                span("senso.wait_indexed", "index"):
+            final = wait_for_indexing(
+                content_ids, lambda cid: get_status(cid, senso_key), INDEX_TIMEOUT, report
+            )
+    except IndexTimeout as exc:
+        console.print(f":x: {exc}")
+        sys.exit(1)
+    failed = [cid for cid, status in final.items() if status == "failed"]
+    if failed:
+        console.print(f":x: Ingestion failed for {', '.join(failed)}")
         sys.exit(1)
-    console.print(f":white_check_mark: Indexed (content_id = {content_id})")
 
 
-def generate(instructions: str, senso_key: str) -> Dict:
+def generate(
+    instructions: str,
+    senso_key: str,
+    content_type: str = DEFAULT_CONTENT_TYPE,
+    max_results: int = 5,
+) -> Dict:
     hdr = {"X-API-Key": senso_key, "Content-Type": "application/json"}
-    resp = requests.post(
-        f"{SENSO_API}/generate",
-        headers=hdr,
-        json={
-            "content_type": "marketing asset",
-            "instructions": instructions,
-            "save": True,
-            "max_results": 5,
-        },
-        timeout=60,
+    with span("senso.generate", "generate", content_type=content_type):
+        resp = requests.post(
+            f"{SENSO_API}/generate",
+            headers=hdr,
+            json={
+                "content_type": content_type,
+                "instructions": instructions,
+                "save": True,
+                "max_results": max_results,
+            },
+            timeout=GENERATE_TIMEOUT,
+        )
+        resp.raise_for_status()
+        return resp.json()
+
+# --------------------------------------------------------------------------- #
+# Asset templates                                                             #
+# --------------------------------------------------------------------------- #
+def load_templates(path: Optional[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Read ``{"Asset name": "instructions" | {"instructions", "content_type",
+    "max_results"}}`` from a JSON file (default: ``DEFAULT_TEMPLATES``).
+    """
+    raw: Dict[str, Any] = DEFAULT_TEMPLATES
+    if path:
+        with open(path, encoding="utf-8") as fh:
+            raw = json.load(fh)
+    templates = {}
+    for name, spec in raw.items():
+        spec = {"instructions": spec} if isinstance(spec, str) else dict(spec)
+        if not spec.get("instructions"):
+            raise ValueError(f"Template {name!r} has no instructions")
+        spec.setdefault("content_type", DEFAULT_CONTENT_TYPE)
+        spec.setdefault("max_results", 5)
+        templates[name] = spec
+    return templates
+
+
+def assets_table(assets: Dict[str, Dict[str, Any]]) -> Table:
+    table = Table(title="Generated Assets", header_style="bold magenta")
+    table.add_column("Asset")
+    table.add_column("Content ID", style="cyan")
+    table.add_column("Latency", justify="right")
+    table.add_column("Preview (first 80 chars)", overflow="fold")
+    for name, asset in assets.items():
+        latency = f"cached {age(asset['cached_at'])} ago" if asset.get("cached") else (
+            f"{asset['seconds']:.1f}s" if "seconds" in asset else ""
+        )
+        if "error" in asset:
+            table.add_row(name, "[red]failed[/red]", latency, asset["error"])
+        elif "content_id" in asset:
+            text = asset["generated_text"]
+            preview = text[:80].replace("\n", " ") + ("…" if len(text) > 80 else "")
+            table.add_row(name, asset["content_id"], latency, preview)
+        else:
+            table.add_row(name, "[dim]generating …[/dim]", "", "")
+    return table
+
+
+def template_key(dataset: str, spec: Dict[str, Any]) -> str:
+    return cache_key(dataset, spec["content_type"], spec["instructions"], spec["max_results"])
+
+
+def generate_one(
+    name: str,
+    spec: Dict[str, Any],
+    senso_key: str,
+    cache: Optional[GenerateCache] = None,
+    dataset: str = "",
+    refresh: bool = False,
+) -> Dict[str, Any]:
+    """One asset: a cache hit, or a timed ``/generate`` call (errors are returned, not raised)."""
+    key = template_key(dataset, spec) if cache else ""
+    hit = cache.get(key) if cache and not refresh else None
+    if hit:
+        return {"content_id": hit["content_id"], "generated_text": hit["generated_text"],
+                "seconds": 0.0, "cached": True, "cached_at": hit["created_at"]}
+    started = time.perf_counter()
+    try:
+        payload = generate(spec["instructions"], senso_key, spec["content_type"], spec["max_results"])
+        result = {
+            "content_id": payload["content_id"],
+            "generated_text": payload["generated_text"].strip(),
+        }
+    except (requests.RequestException, KeyError) as exc:
+        result = {"error": str(exc)}
+    result["seconds"] = time.perf_counter() - started
+    if cache and "error" not in result:
+        cache.put(key, asset=name, **result)
+    return result
+
+
+def generate_assets(
+    templates: Dict[str, Dict[str, Any]],
+    senso_key: str,
+    workers: int = 4,
+    cache: Optional[GenerateCache] = None,
+    dataset: str = "",
+    refresh: bool = False,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Run every template through ``/generate`` concurrently; the table fills
+    in as each asset completes.  Returns per-asset results with latency.
+    With a ``cache``, assets already generated from the same ``dataset``
+    hash are reused unless ``refresh`` is set.
+    """
+    from rich.live import Live
+
+    assets: Dict[str, Dict[str, Any]] = {name: {} for name in templates}
+    with Live(assets_table(assets), console=console, refresh_per_second=8) as live:
+        with ThreadPoolExecutor(max(1, min(workers, len(templates)))) as pool:
+            futures = {
+                pool.submit(generate_one, name, spec, senso_key, cache, dataset, refresh): name
+                for name, spec in templates.items()
+            }
+            for fut in as_completed(futures):
+                assets[futures[fut]] = fut.result()
+                live.update(assets_table(assets))
+    return assets
+
+# --------------------------------------------------------------------------- #
+# Batch mode                                                                  #
+# --------------------------------------------------------------------------- #
+BATCH_KINDS = {
+    "profile": ("Profile", "profiles"),
+    "hashtag": ("Hashtag", "hashtags"),
+    "search": ("Search", "searchQueries"),
+}
+STAGES = ("pending", "scraped", "uploaded", "indexed", "done")
+
+
+def parse_batch_file(path: str) -> List[Tuple[str, str, str]]:
+    """
+    One descriptor per line: ``profile:name``, ``hashtag:tag``,
+    ``search:free text`` or a bare username.  Blank lines and ``#``
+    comments are skipped; duplicates are dropped.
+    """
+    jobs: Dict[str, Tuple[str, str, str]] = {}
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            kind, sep, value = line.partition(":")
+            kind = kind.strip().lower()
+            if not sep or kind not in BATCH_KINDS:
+                kind, value = "profile", line
+            value = value.strip().lstrip("@" if kind == "profile" else "#" if kind == "hashtag" else "")
+            if value:
+                label, field = BATCH_KINDS[kind]
+                jobs.setdefault(f"{label} {value}", (label, field, value))
+    return list(jobs.values())
+
+
+class BatchCheckpoint(JsonStore):
+    """
+    Per-descriptor progress (stage reached, dataset hash, content IDs,
+    generated assets, last error) in ``<state_dir>/checkpoint.json``, with
+    each scraped dataset's markdown saved next to it, so a crashed run
+    resumes where it stopped.
+    """
+
+    def __init__(self, state_dir: str) -> None:
+        os.makedirs(os.path.join(state_dir, "datasets"), exist_ok=True)
+        super().__init__(os.path.join(state_dir, "checkpoint.json"))
+        self.state_dir = state_dir
+
+    def get(self, descriptor: str) -> Dict[str, Any]:
+        with self.lock:
+            return json.loads(json.dumps(self.entries.get(descriptor, {"stage": "pending"})))
+
+    def update(self, descriptor: str, **fields: Any) -> None:
+        with self.lock:
+            entry = self.entries.setdefault(descriptor, {"stage": "pending", "assets": {}})
+            entry.update(fields, updated_at=time.strftime("%Y-%m-%dT%H:%M:%S"))
+            self.save()
+
+    def record_asset(self, descriptor: str, name: str, asset: Dict[str, Any]) -> None:
+        with self.lock:
+            self.entries[descriptor].setdefault("assets", {})[name] = asset
+            self.save()
+
+    def dataset_path(self, descriptor: str) -> str:
+        slug = re.sub(r"[^\w.-]+", "_", descriptor).strip("_")
+        return os.path.join(self.state_dir, "datasets", f"{slug}.md")
+
+
+def reached(entry: Dict[str, Any], stage: str) -> bool:
+    return STAGES.index(entry.get("stage", "pending")) >= STAGES.index(stage)
+
+
+class BatchRunner:
+    """
+    Push many descriptors through scrape → upload → index → generate with a
+    separate pool (and limit) per stage, so the stages overlap across
+    descriptors.  Each stage is checkpointed; resumed descriptors skip the
+    stages they already finished, and only missing assets are generated.
+    A failure is recorded against its descriptor and never stops the batch.
+    """
+
+    def __init__(
+        self,
+        jobs: List[Tuple[str, str, str]],
+        templates: Dict[str, Dict[str, Any]],
+        checkpoint: BatchCheckpoint,
+        senso_key: str,
+        apify_token: str,
+        args: argparse.Namespace,
+        cache: Optional[GenerateCache] = None,
+    ) -> None:
+        from rich.progress import BarColumn, MofNCompleteColumn, Progress, TextColumn
+
+        self.jobs = jobs
+        self.templates = templates
+        self.checkpoint = checkpoint
+        self.senso_key = senso_key
+        self.apify_token = apify_token
+        self.args = args
+        self.cache = cache
+        self.scrapers = ThreadPoolExecutor(args.scrape_workers)
+        self.uploaders = ThreadPoolExecutor(args.upload_workers)
+        self.generators = ThreadPoolExecutor(args.generate_workers)
+        self.poller = StatusPoller(lambda cid: get_status(cid, senso_key))
+        self.cond = threading.Condition()
+        self.remaining = len(jobs)
+        self.progress = Progress(
+            TextColumn("{task.description:<10}"), BarColumn(), MofNCompleteColumn(), console=console
+        )
+        self.stages = {
+            stage: self.progress.add_task(stage, total=len(jobs))
+            for stage in ("scraped", "uploaded", "indexed")
+        }
+        self.stages["generated"] = self.progress.add_task("generated", total=len(jobs) * len(templates))
+
+    # ------------------------------------------------------------------ #
+    def run(self) -> None:
+        with self.progress, self.poller:
+            for label, field, value in self.jobs:
+                descriptor = f"{label} {value}"
+                self._advance(descriptor, self.checkpoint.get(descriptor), (field, value), resumed=True)
+            with self.cond:
+                while self.remaining:
+                    self.cond.wait()
+        for pool in (self.scrapers, self.uploaders, self.generators):
+            pool.shutdown(wait=True)
+
+    def _advance(
+        self,
+        descriptor: str,
+        entry: Dict[str, Any],
+        source: Tuple[str, str] = ("", ""),
+        resumed: bool = False,
+    ) -> None:
+        """
+        Dispatch ``descriptor`` to the first stage it has not finished
+        (``resumed``: credit the stages a previous run already finished).
+        """
+        dataset_saved = os.path.exists(self.checkpoint.dataset_path(descriptor))
+        if not reached(entry, "scraped") or (not reached(entry, "uploaded") and not dataset_saved):
+            return self._submit(self.scrapers, self._scrape, descriptor, *source)
+        if resumed:
+            for stage in ("scraped", "uploaded", "indexed"):
+                if reached(entry, stage):
+                    self.progress.advance(self.stages[stage])
+        if not reached(entry, "uploaded"):
+            return self._submit(self.uploaders, self._upload, descriptor)
+        if not reached(entry, "indexed"):
+            return self._index(descriptor, entry["content_ids"])
+        self._generate(descriptor, entry)
+
+    def _submit(self, pool: ThreadPoolExecutor, fn: Callable[..., None], descriptor: str, *args: Any) -> None:
+        def guarded() -> None:
+            try:
+                fn(descriptor, *args)
+            except Exception as exc:  # recorded per descriptor; the batch carries on
+                self._fail(descriptor, f"{fn.__name__.strip('_')}: {exc}")
+
+        pool.submit(guarded)
+
+    def _fail(self, descriptor: str, error: str) -> None:
+        self.checkpoint.update(descriptor, error=error)
+        console.print(f":x: {descriptor}: {error}")
+        self._finished()
+
+    def _finished(self) -> None:
+        with self.cond:
+            self.remaining -= 1
+            self.cond.notify_all()
+
+    # ------------------------------------------------------------------ #
+    def _scrape(self, descriptor: str, field: str, value: str) -> None:
+        items = run_apify_actor(build_actor_input(field, value, self.args.results), self.apify_token)
+        if not items:
+            return self._fail(descriptor, "no TikTok records returned")
+        with open(self.checkpoint.dataset_path(descriptor), "w", encoding="utf-8") as fh, \
+                span("markdown", "markdown", descriptor=descriptor, items=len(items)):
+            write_markdown(
+                fh,
+                descriptor,
+                items,
+                payload=self.args.payload,
+                fields=parse_fields(self.args.payload_fields),
+                layout="caption",
+            )
+        self.checkpoint.update(descriptor, stage="scraped", videos=len(items), dataset=items_hash(items))
+        self.progress.advance(self.stages["scraped"])
+        self._advance(descriptor, self.checkpoint.get(descriptor))
+
+    def _upload(self, descriptor: str) -> None:
+        with open(self.checkpoint.dataset_path(descriptor), encoding="utf-8") as fh:
+            markdown = fh.read()
+        content_ids = upload_dataset(descriptor, markdown, self.senso_key, self.args.chunk_chars)
+        self.checkpoint.update(descriptor, stage="uploaded", content_ids=content_ids)
+        self.progress.advance(self.stages["uploaded"])
+        self._advance(descriptor, self.checkpoint.get(descriptor))
+
+    def _index(self, descriptor: str, content_ids: List[str]) -> None:
+        started = time.perf_counter()
+
+        def on_indexed(content_id: str, status: str) -> None:
+            tracing.record("senso.wait_indexed", "index", started, content_ids=content_ids, status=status)
+            try:
+                if status != "completed":
+                    # Back to "scraped", so the next run re-uploads the saved dataset.
+                    self.checkpoint.update(descriptor, stage="scraped", content_ids=[])
+                    return self._fail(descriptor, f"index: processing failed for {content_id}")
+                self.checkpoint.update(descriptor, stage="indexed")
+                self.progress.advance(self.stages["indexed"])
+                self._advance(descriptor, self.checkpoint.get(descriptor))
+            except Exception as exc:  # runs on the poller thread; never leave run() waiting
+                self._fail(descriptor, f"index: {exc}")
+
+        self.poller.track_all(content_ids, on_indexed)
+
+    def _generate(self, descriptor: str, entry: Dict[str, Any]) -> None:
+        done = {name for name, asset in entry.get("assets", {}).items() if "error" not in asset}
+        todo = [name for name in self.templates if name not in done]
+        self.progress.advance(self.stages["generated"], len(self.templates) - len(todo))
+        if not todo:
+            self.checkpoint.update(descriptor, stage="done", error=None)
+            return self._finished()
+        left = set(todo)
+        errors: List[str] = []
+        lock = threading.Lock()
+
+        def run(name: str) -> None:
+            spec = dict(self.templates[name])
+            # Every profile shares one workspace, so point the prompt at this dataset.
+            spec["instructions"] = f"Using the TikTok dataset for {descriptor}: {spec['instructions']}"
+            try:
+                asset = generate_one(
+                    name, spec, self.senso_key, self.cache, entry.get("dataset", ""), self.args.refresh
+                )
+                self.checkpoint.record_asset(descriptor, name, asset)
+                error = asset.get("error")
+                if asset.get("cached"):
+                    console.print(f"→ {descriptor}: {name} served from cache ({age(asset['cached_at'])} old)")
+            except Exception as exc:  # counted like a failed asset so the descriptor still finishes
+                error = str(exc) or type(exc).__name__
+            self.progress.advance(self.stages["generated"])
+            with lock:
+                left.discard(name)
+                if error:
+                    errors.append(f"{name}: {error}")
+                if left:
+                    return
+            if errors:
+                self._fail(descriptor, "generate: " + "; ".join(errors))
+            else:
+                self.checkpoint.update(descriptor, stage="done", error=None)
+                self._finished()
+
+        for name in todo:
+            self.generators.submit(run, name)
+
+
+def batch_summary(jobs: List[Tuple[str, str, str]], checkpoint: BatchCheckpoint) -> Table:
+    table = Table(title="Batch Summary", header_style="bold magenta")
+    table.add_column("Descriptor")
+    table.add_column("Stage")
+    table.add_column("Videos", justify="right")
+    table.add_column("Assets", justify="right")
+    table.add_column("Error", overflow="fold")
+    for label, _, value in jobs:
+        entry = checkpoint.get(f"{label} {value}")
+        assets = entry.get("assets", {})
+        ok = sum(1 for asset in assets.values() if "error" not in asset)
+        stage = entry.get("stage", "pending")
+        table.add_row(
+            f"{label} {value}",
+            f"[green]{stage}[/green]" if stage == "done" else stage,
+            str(entry.get("videos", "")),
+            f"{ok}/{len(assets)}" if assets else "",
+            entry.get("error") or "",
+        )
+    return table
+
+
+def run_batch(args: argparse.Namespace, templates: Dict[str, Dict[str, Any]], senso_key: str,
+              apify_token: str) -> None:
+    jobs = parse_batch_file(args.batch)
+    if not jobs:
+        console.print(f":warning: No descriptors in {args.batch}")
+        sys.exit(1)
+    checkpoint = BatchCheckpoint(args.state_dir)
+    finished = sum(1 for label, _, value in jobs if checkpoint.get(f"{label} {value}")["stage"] == "done")
+    console.print(
+        f"[bold]Batch:[/bold] {len(jobs)} descriptors ({finished} already done), "
+        f"{len(templates)} assets each; checkpoint in {checkpoint.path}"
     )
-    resp.raise_for_status()
-    return resp.json()
+    cache = None
+    if args.cache:
+        cache = GenerateCache(args.cache, ttl=args.cache_ttl * 3600 if args.cache_ttl else None)
+    BatchRunner(jobs, templates, checkpoint, senso_key, apify_token, args, cache).run()
+    console.print(batch_summary(jobs, checkpoint))
+    failed = [f"{label} {value}" for label, _, value in jobs
+              if checkpoint.get(f"{label} {value}").get("stage") != "done"]
+    if failed:
+        console.print(f":x: {len(failed)} unfinished; rerun the same command to resume.")
+        sys.exit(1)
 
 # --------------------------------------------------------------------------- #
 # Main                                                                        #
@@ -176,6 +614,13 @@ def main(args: argparse.Namespace) -> None:
     if not senso_key or not apify_token:
         console.print(":warning:  Set SENSO_KEY and APIFY_TOKEN env vars first.")
         sys.exit(1)
+    try:
+        templates = load_templates(args.templates)
+    except (OSError, ValueError) as exc:
+        console.print(f":x: Could not load templates: {exc}")
+        sys.exit(1)
+    if args.batch:
+        return run_batch(args, templates, senso_key, apify_token)
 
     descriptors = [
         ("Profile", "profiles", args.profile),
@@ -213,27 +658,7 @@ def main(args: argparse.Namespace) -> None:
 
     label, field, value = provided[0]
     descriptor = f"{label} {value}"
-
-    actor_input: Dict[str, Any] = {
-        field: [value],
-        "resultsPerPage": args.results,
-        "shouldDownloadVideos": True,
-        "shouldDownloadAvatars": False,
-        "shouldDownloadCovers": False,
-        "shouldDownloadMusicCovers": False,
-        "shouldDownloadSlideshowImages": False,
-        "shouldDownloadSubtitles": False,
-        "scrapeRelatedVideos": False,
-        "proxyCountryCode": "US",
-    }
-    if field == "profiles":
-        actor_input.update(
-            {
-                "excludePinnedPosts": False,
-                "profileScrapeSections": ["videos"],
-                "profileSorting": "latest",
-            }
-        )
+    actor_input = build_actor_input(field, value, args.results)
 
     console.print(f"[bold]Retrieving TikTok data:[/bold] {descriptor}")
     items = run_apify_actor(actor_input, apify_token)
@@ -241,44 +666,56 @@ def main(args: argparse.Namespace) -> None:
         console.print(f":warning:  No TikTok records found for {descriptor}")
         sys.exit(1)
 
-    markdown = items_to_markdown(descriptor, items)
+    with span("markdown", "markdown", descriptor=descriptor, items=len(items)):
+        markdown = items_to_markdown(
+            descriptor,
+            items,
+            payload=args.payload,
+            fields=parse_fields(args.payload_fields),
+            layout="caption",
+        )
     console.print(f"→ harvested {len(items)} videos; {len(markdown):,} chars")
 
-    console.print("Uploading article to Senso …")
-    cid = post_raw(descriptor, markdown, senso_key)
-    console.print(f"→ content_id = {cid}")
-
-    poll_status(cid, senso_key)
-
-    # Generation templates
-    templates = {
-        "Tweet thread (10 tweets)": (
-            "Write a 10-tweet thread summarising the key ideas in an engaging tone."
-        ),
-        "LinkedIn post": (
-            "Write a LinkedIn post (≤ 2 200 chars) summarising the article for professionals."
-        ),
-        "Email teaser": (
-            "Write a short email teaser (subject + 3-sentence body) that drives readers to the full post."
-        ),
-    }
-
-    table = Table(title="Generated Assets", header_style="bold magenta")
-    table.add_column("Asset")
-    table.add_column("Content ID", style="cyan")
-    table.add_column("Preview (first 80 chars)", overflow="fold")
+    cache = None
+    if args.cache:
+        cache = GenerateCache(args.cache, ttl=args.cache_ttl * 3600 if args.cache_ttl else None)
+    dataset = items_hash(items)
+    all_cached = cache is not None and not args.refresh and all(
+        cache.get(template_key(dataset, spec)) for spec in templates.values()
+    )
 
-    for asset_name, prompt in templates.items():
-        console.print(f"\n[bold green]Generating {asset_name} …[/bold green]")
-        payload = generate(prompt, senso_key)
-        asset_id = payload["content_id"]
-        generated = payload["generated_text"].strip()
-        preview = generated[:80].replace("\n", " ") + ("…" if len(generated) > 80 else "")
-        table.add_row(asset_name, asset_id, preview)
-        console.print(f":white_check_mark: Saved as content {asset_id}")
-
-    console.print()
-    console.print(table)
+    if all_cached:
+        console.print(
+            "→ dataset unchanged and every asset is cached; skipping upload (--refresh to regenerate)"
+        )
+    else:
+        console.print("Uploading article to Senso …")
+        cids = upload_dataset(descriptor, markdown, senso_key, args.chunk_chars)
+        if len(cids) > 1:
+            console.print(f"→ split into {len(cids)} parts: {', '.join(cids)}")
+        else:
+            console.print(f"→ content_id = {cids[0]}")
+        poll_status(cids, senso_key)
+
+    console.print(f"\n[bold green]Generating {len(templates)} assets …[/bold green]")
+    started = time.perf_counter()
+    assets = generate_assets(
+        templates, senso_key, args.generate_workers, cache, dataset, args.refresh
+    )
+    wall = time.perf_counter() - started
+    serial = sum(asset["seconds"] for asset in assets.values())
+    cached = sum(1 for asset in assets.values() if asset.get("cached"))
+    for name, asset in assets.items():
+        if asset.get("cached"):
+            console.print(f"→ {name}: served from cache ({age(asset['cached_at'])} old)")
+    console.print(
+        f"→ {wall:.1f}s wall time for {serial:.1f}s of generation "
+        f"({serial / wall if wall else 1:.1f}x overlap; {cached} from cache)"
+    )
+    failed = [name for name, asset in assets.items() if "error" in asset]
+    if failed:
+        console.print(f":x: Generation failed for {', '.join(failed)}")
+        sys.exit(1)
     console.print("\nDone! Review or edit the assets in Senso whenever you like.")
 
 
@@ -295,4 +732,83 @@ if __name__ == "__main__":
         default=5,
         help="Number of videos to fetch for the selected descriptor.",
     )
-    main(parser.parse_args())
+    parser.add_argument(
+        "--templates",
+        metavar="PATH",
+        help="JSON file of {asset name: instructions} to generate (default: tweet thread, "
+        "LinkedIn post, email teaser; see templates.example.json).",
+    )
+    parser.add_argument(
+        "--generate-workers",
+        type=int,
+        default=4,
+        help="Assets generated concurrently (in --batch mode: across all descriptors).",
+    )
+    parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="Repurpose every descriptor in FILE (one per line: profile:NAME, hashtag:TAG, "
+        "search:QUERY or a bare username); resumable.",
+    )
+    parser.add_argument(
+        "--state-dir",
+        default="repurpose_batch",
+        help="Batch checkpoint and scraped datasets; rerun with the same directory to resume.",
+    )
+    parser.add_argument("--scrape-workers", type=int, default=4, help="Concurrent Apify scrapes (--batch).")
+    parser.add_argument("--upload-workers", type=int, default=4, help="Concurrent Senso uploads (--batch).")
+    parser.add_argument(
+        "--cache",
+        nargs="?",
+        const="generate_cache.json",
+        metavar="PATH",
+        help="Reuse assets generated from the same videos and captions and the same template, "
+        "stored in PATH (default generate_cache.json). Off unless given; view counts and "
+        "other stats are not part of the key.",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=168,
+        help="Hours a cached asset stays valid (0 = forever).",
+    )
+    parser.add_argument(
+        "--refresh", action="store_true", help="Regenerate every asset and overwrite the cache."
+    )
+    parser.add_argument(
+        "--payload",
+        choices=PAYLOAD_MODES,
+        default="pretty",
+        help="Structured JSON block appended to each dataset: pretty (indented array), "
+        "compact (one object per line; smaller, faster) or none.",
+    )
+    parser.add_argument(
+        "--payload-fields",
+        help="Comma-separated item fields for the JSON block, e.g. text,videoMeta.duration "
+        "(default: video metadata, media URLs and caption).",
+    )
+    parser.add_argument(
+        "--chunk-chars",
+        type=int,
+        default=0,
+        help="Split datasets larger than this many characters into parts uploaded in parallel.",
+    )
+    parser.add_argument(
+        "--trace",
+        nargs="?",
+        const="tiktok_repurpose_trace.json",
+        metavar="PATH",
+        help="Trace every stage and HTTP call; write a Chrome-trace timeline to PATH "
+        "(default tiktok_repurpose_trace.json) and print a per-stage summary.",
+    )
+    cli_args = parser.parse_args()
+    if cli_args.trace:
+        tracing.enable()
+    try:
+        main(cli_args)
+    finally:
+        tracer = tracing.disable()
+        if tracer is not None:
+            tracer.write(cli_args.trace)
+            console.print(tracer.summary_table())
+            console.print(f"→ timeline written to {cli_args.trace} (open in https://ui.perfetto.dev)")
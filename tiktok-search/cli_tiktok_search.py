@@ -8,19 +8,39 @@ USAGE
   export SENSO_KEY="sk_prod_xxx"
   export APIFY_TOKEN="apify_api_xxx"
   python cli_tiktok_search.py --profiles tiktok --hashtags openai --search-queries "ai trends"
+  python cli_tiktok_search.py --profiles tiktok --local-index tiktok_index.npz   # offline keyword hits
+  python cli_tiktok_search.py --profiles tiktok nba --hashtags openai --ready first   # ask while the rest ingest
+  python cli_tiktok_search.py --profiles tiktok nba --hashtags openai --consolidate   # one indexing job
+  python cli_tiktok_search.py --profiles tiktok --results-per 200000 --shard-items 5000   # resumable shards
+  python cli_tiktok_search.py --profiles tiktok nba --trace   # stage timeline + summary
 """
 
 import argparse
-import json
 import os
 import sys
+import threading
 import time
-from typing import Any, Dict, Iterable, List
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 import requests
 from rich.console import Console
 from rich.table import Table
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from chunking import split_markdown, upload_chunks  # noqa: E402
+from senso_poller import IndexTimeout, StatusPoller, wait_for_indexing  # noqa: E402
+from tiktok_markdown import PAYLOAD_MODES, items_to_markdown, parse_fields  # noqa: E402
+from tiktok_shards import (  # noqa: E402
+    DEFAULT_SHARD_ITEMS,
+    ShardManifest,
+    fingerprint,
+    shard_title,
+    upload_shards,
+)
+import tracing  # noqa: E402
+from tracing import span  # noqa: E402
+
 # --------------------------------------------------------------------------- #
 # Config (feel free to tweak)                                                 #
 # --------------------------------------------------------------------------- #
@@ -28,7 +48,12 @@ SENSO_API = "https://sdk.senso.ai/api/v1"
 APIFY_RUN_SYNC_ITEMS = (
     "https://api.apify.com/v2/acts/clockworks~tiktok-scraper/run-sync-get-dataset-items"
 )
-POLL_INTERVAL = 3  # seconds between status checks
+APIFY_ACT_RUNS = "https://api.apify.com/v2/acts/clockworks~tiktok-scraper/runs"
+APIFY_RUN = "https://api.apify.com/v2/actor-runs/{run_id}"
+APIFY_DATASET_ITEMS = "https://api.apify.com/v2/datasets/{dataset_id}/items"
+APIFY_RUN_ACTIVE = ("READY", "RUNNING", "TIMING-OUT", "ABORTING")
+APIFY_RUN_FAILED = ("FAILED", "ABORTED", "TIMED-OUT")
+INDEX_TIMEOUT = 1800  # seconds to wait for Senso indexing
 
 console = Console()
 
@@ -43,11 +68,13 @@ def run_apify_actor(
     """
     params = {"token": token}
     headers = {"Content-Type": "application/json"}
-    resp = requests.post(
-        APIFY_RUN_SYNC_ITEMS, params=params, json=actor_input, headers=headers, timeout=timeout
-    )
-    resp.raise_for_status()
-    data = resp.json()
+    with span("apify.run_sync", "apify") as info:
+        resp = requests.post(
+            APIFY_RUN_SYNC_ITEMS, params=params, json=actor_input, headers=headers, timeout=timeout
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        info["items"] = len(data) if isinstance(data, list) else 0
 
     if isinstance(data, dict) and data.get("error"):
         raise RuntimeError(f"Apify error: {data}")
@@ -56,79 +83,55 @@ def run_apify_actor(
     return data
 
 
-def items_to_markdown(descriptor: str, items: Iterable[Dict[str, Any]]) -> str:
+def start_apify_run(actor_input: Dict[str, Any], token: str) -> Dict[str, Any]:
     """
-    Transform TikTok dataset items into markdown suitable for Senso ingestion.
+    Start the scraper asynchronously (no run-sync size/time limits) and return
+    the run object; its ``defaultDatasetId`` is known immediately.
     """
-    lines: List[str] = [f"# TikTok dataset for {descriptor}", ""]
-    structured: List[Dict[str, Any]] = []
-
-    for idx, item in enumerate(items, start=1):
-        video_id = item.get("id", "unknown")
-        caption = (item.get("text") or "").strip() or "<no caption>"
-        author = item.get("authorMeta", {}) or {}
-        author_name = author.get("nickName") or author.get("name") or "unknown author"
-        author_handle = author.get("name") or ""
-        published = item.get("createTimeISO") or str(item.get("createTime") or "unknown")
-        stats = {
-            "likes": item.get("diggCount"),
-            "comments": item.get("commentCount"),
-            "shares": item.get("shareCount"),
-            "plays": item.get("playCount"),
-            "collects": item.get("collectCount"),
-        }
-        hashtag_list = ", ".join(f"#{h.get('name')}" for h in item.get("hashtags", []) if h.get("name"))
-        video_url = item.get("webVideoUrl") or author.get("profileUrl")
-        video_meta = item.get("videoMeta") or {}
-        download_url = video_meta.get("downloadAddr")
-        media_urls = item.get("mediaUrls") or []
-
-        author_line = author_name if not author_handle else f"{author_name} (@{author_handle})"
-
-        lines.append(f"## Video {idx} — {video_id}")
-        lines.append(f"- Author: {author_line}")
-        lines.append(f"- Published: {published}")
-        lines.append(f"- TikTok URL: {video_url or 'n/a'}")
-        if download_url:
-            lines.append(f"- Download URL: {download_url}")
-        for media in media_urls:
-            if media:
-                lines.append(f"- Media URL: {media}")
-        lines.append(f"- Caption: {caption}")
-        if hashtag_list:
-            lines.append(f"- Hashtags: {hashtag_list}")
-        stat_parts = [f"{key}={value}" for key, value in stats.items() if isinstance(value, int)]
-        if stat_parts:
-            lines.append(f"- Stats: {', '.join(stat_parts)}")
-        music = item.get("musicMeta", {})
-        if music:
-            lines.append(
-                f"- Music: {music.get('musicName') or 'n/a'} by {music.get('musicAuthor') or 'unknown'}"
-            )
-        lines.append("")
-
-        structured.append(
-            {
-                "videoMeta.coverUrl": video_meta.get("coverUrl"),
-                "videoMeta.duration": video_meta.get("duration"),
-                "videoMeta.definition": video_meta.get("definition"),
-                "videoMeta.format": video_meta.get("format"),
-                "videoMeta.height": video_meta.get("height"),
-                "videoMeta.width": video_meta.get("width"),
-                "videoMeta.downloadAddr": download_url,
-                "mediaUrls": media_urls,
-                "text": caption,
-            }
-        )
+    with span("apify.start_run", "apify"):
+        resp = requests.post(APIFY_ACT_RUNS, params={"token": token}, json=actor_input, timeout=60)
+        resp.raise_for_status()
+        return resp.json()["data"]
+
+
+def get_apify_run(run_id: str, token: str, wait: int = 0) -> Dict[str, Any]:
+    """The run object, after waiting up to ``wait`` seconds for the run to finish."""
+    resp = requests.get(
+        APIFY_RUN.format(run_id=run_id), params={"token": token, "waitForFinish": wait}, timeout=wait + 30
+    )
+    resp.raise_for_status()
+    return resp.json()["data"]
+
 
-    if structured:
-        lines.append("### Structured Payload")
-        lines.append("```json")
-        lines.append(json.dumps(structured, indent=2))
-        lines.append("```")
-        lines.append("")
+def wait_apify_run(run_id: str, token: str) -> Dict[str, Any]:
+    """Long-poll an Apify run until it finishes; raises unless it SUCCEEDED."""
+    with span("apify.wait_run", "apify", run_id=run_id):
+        while True:
+            run = get_apify_run(run_id, token, wait=60)
+            if run["status"] not in APIFY_RUN_ACTIVE:
+                break
+    if run["status"] != "SUCCEEDED":
+        raise RuntimeError(f"Apify run {run_id} ended with status {run['status']}")
+    return run
+
+
+def fetch_dataset_items(
+    dataset_id: str, token: str, offset: int, limit: int
+) -> List[Dict[str, Any]]:
+    """
+    One page of an Apify dataset.  With ``clean`` the API drops empty and
+    hidden items, so a page can be short before the end; only an empty page
+    means the dataset is exhausted.
+    """
+    with span("apify.dataset_page", "apify", offset=offset, limit=limit):
+        resp = requests.get(
+            APIFY_DATASET_ITEMS.format(dataset_id=dataset_id),
+            params={"token": token, "offset": offset, "limit": limit, "clean": "true", "format": "json"},
+            timeout=120,
+        )
+        resp.raise_for_status()
+        return resp.json()
 
-    return "\n".join(lines).strip()
 
 # --------------------------------------------------------------------------- #
 # Senso helpers                                                               #
@@ -138,50 +141,38 @@ def create_raw_content(title: str, text: str, senso_key: str) -> str:
     POST /content/raw and return the new content_id.
     """
     hdr = {"X-API-Key": senso_key, "Content-Type": "application/json"}
-    resp = requests.post(
-        f"{SENSO_API}/content/raw",
-        headers=hdr,
-        json={"title": title, "text": text, "summary": f"Imported from {title}"}
-    )
-    resp.raise_for_status()
-    return resp.json()["id"]
+    with span("senso.upload", "upload", title=title, chars=len(text)):
+        resp = requests.post(
+            f"{SENSO_API}/content/raw",
+            headers=hdr,
+            json={"title": title, "text": text, "summary": f"Imported from {title}"}
+        )
+        resp.raise_for_status()
+        return resp.json()["id"]
 
 
-def wait_until_indexed(content_id: str, senso_key: str) -> None:
-    """
-    Poll /content/{content_id} until processing_status == completed or failed.
-    """
+def get_status(content_id: str, senso_key: str) -> str:
     hdr = {"X-API-Key": senso_key}
-    status = ""
-    spinner = console.status(f"[cyan]Processing {content_id} …[/cyan]")
-    spinner.start()
-
-    while status not in ("completed", "failed"):
-        time.sleep(POLL_INTERVAL)
+    with span("senso.status", "index", content_id=content_id):
         resp = requests.get(f"{SENSO_API}/content/{content_id}", headers=hdr, timeout=30)
         resp.raise_for_status()
-        status = resp.json()["processing_status"]
+        return resp.json()["processing_status"]
 
-    spinner.stop()
-
-    if status == "failed":
-        console.print(f":x: Processing failed for {content_id}")
-        sys.exit(1)
-    console.print(f":white_check_mark: Indexed (content_id = {content_id})")
 
 # --------------------------------------------------------------------------- #
 # Search helpers                                                              #
 # --------------------------------------------------------------------------- #
 def ask_question(question: str, senso_key: str) -> dict:
     hdr = {"X-API-Key": senso_key, "Content-Type": "application/json"}
-    resp = requests.post(
-        f"{SENSO_API}/search",
-        headers=hdr,
-        json={"query": question, "max_results": 5},
-        timeout=30,
-    )
-    resp.raise_for_status()
-    return resp.json()
+    with span("senso.search", "search"):
+        resp = requests.post(
+            f"{SENSO_API}/search",
+            headers=hdr,
+            json={"query": question, "max_results": 5},
+            timeout=30,
+        )
+        resp.raise_for_status()
+        return resp.json()
 
 
 def render_answer(payload: dict) -> None:
@@ -203,26 +194,381 @@ def render_answer(payload: dict) -> None:
 # --------------------------------------------------------------------------- #
 # Main driver                                                                 #
 # --------------------------------------------------------------------------- #
-def ingest_descriptor(
+def scrape_descriptor(
     descriptor: str,
     actor_input: Dict[str, Any],
-    senso_key: str,
     apify_token: str,
+    markdown_options: Optional[Dict[str, Any]] = None,
 ) -> str:
-    console.print(f"\n[bold]Fetching TikTok data for:[/bold] {descriptor}")
+    """Run the Apify scrape for one descriptor and return its markdown ("" if empty)."""
     items = run_apify_actor(actor_input, apify_token)
     if not items:
         console.print(f":warning: No TikTok records returned for {descriptor}")
         return ""
+    with span("markdown", "markdown", descriptor=descriptor, items=len(items)):
+        markdown = items_to_markdown(descriptor, items, **(markdown_options or {}))
+    console.print(f"→ {descriptor}: formatted {len(items)} items into {len(markdown):,} characters")
+    return markdown
+
+
+def upload_markdown(title: str, markdown: str, senso_key: str, chunk_chars: int = 0) -> List[str]:
+    """Upload one document, split into parallel parts when it exceeds ``chunk_chars``."""
+    if chunk_chars and len(markdown) > chunk_chars:
+        return upload_chunks(
+            title,
+            split_markdown(markdown, chunk_chars),
+            lambda part, text: create_raw_content(part, text, senso_key),
+        )
+    return [create_raw_content(title, markdown, senso_key)]
+
+
+def dedupe_datasets(
+    datasets: List[Tuple[str, List[Dict[str, Any]]]]
+) -> List[Tuple[str, List[Dict[str, Any]], Dict[str, str]]]:
+    """
+    Drop videos already listed under an earlier descriptor (matched by id).
+    Returns ``(descriptor, items, {video_id: first descriptor})`` per dataset.
+    """
+    owner: Dict[str, str] = {}
+    deduped = []
+    for descriptor, items in datasets:
+        kept: List[Dict[str, Any]] = []
+        repeats: Dict[str, str] = {}
+        for item in items:
+            video_id = str(item.get("id") or "")
+            if video_id and video_id in owner:
+                repeats[video_id] = owner[video_id]
+                continue
+            if video_id:
+                owner[video_id] = descriptor
+            kept.append(item)
+        deduped.append((descriptor, kept, repeats))
+    return deduped
+
+
+def section_markdown(
+    descriptor: str,
+    items: List[Dict[str, Any]],
+    repeats: Dict[str, str],
+    markdown_options: Optional[Dict[str, Any]] = None,
+) -> str:
+    with span("markdown", "markdown", descriptor=descriptor, items=len(items)):
+        markdown = items_to_markdown(descriptor, items, **(markdown_options or {}))
+    if not repeats:
+        return markdown
+    listed = "; ".join(f"{vid} (see {owner})" for vid, owner in repeats.items())
+    return f"{markdown}\n\nAlso returned for {descriptor}: {listed}"
+
+
+def pack_sections(sections: Iterable[Tuple[str, str]], max_chars: int = 0) -> Iterator[str]:
+    """
+    Pack ``(descriptor, markdown)`` sections into documents of at most
+    ~``max_chars`` characters (0 = one document).  A section that alone is
+    too large is split at headings, and each piece repeats its descriptor
+    heading so every video stays attributed.
+    """
+    doc: List[str] = []
+    size = 0
+    for descriptor, markdown in sections:
+        pieces = [markdown]
+        if max_chars and len(markdown) > max_chars:
+            heading = f"# TikTok dataset for {descriptor} (continued)\n\n"
+            pieces = [
+                piece if i == 0 else heading + piece
+                for i, piece in enumerate(split_markdown(markdown, max_chars - len(heading)))
+            ]
+        for piece in pieces:
+            if doc and max_chars and size + len(piece) + 2 > max_chars:
+                yield "\n\n".join(doc)
+                doc, size = [], 0
+            doc.append(piece)
+            size += len(piece) + 2
+    if doc:
+        yield "\n\n".join(doc)
+
+
+def ingest_consolidated(
+    jobs: List[Tuple[str, Dict[str, Any]]],
+    senso_key: str,
+    apify_token: str,
+    max_doc_chars: int = 0,
+    index: Optional[Any] = None,
+    scrape_workers: int = 4,
+    markdown_options: Optional[Dict[str, Any]] = None,
+    index_timeout: float = INDEX_TIMEOUT,
+) -> List[str]:
+    """
+    Scrape every descriptor concurrently, deduplicate videos by id and upload
+    the result as one combined document (or a few ``max_doc_chars``-capped
+    ones), so a multi-descriptor run waits on ~one indexing job.
+    """
+    for descriptor, _ in jobs:
+        console.print(f"[bold]Fetching TikTok data for:[/bold] {descriptor}")
+    datasets: List[Tuple[str, List[Dict[str, Any]]]] = []
+    with ThreadPoolExecutor(max(1, min(scrape_workers, len(jobs)))) as pool:
+        futures = [pool.submit(run_apify_actor, actor_input, apify_token) for _, actor_input in jobs]
+        for (descriptor, _), fut in zip(jobs, futures):
+            try:
+                items = fut.result()
+            except Exception as exc:  # one bad scrape should not sink the batch
+                console.print(f":x: {descriptor}: scrape failed: {exc}")
+                continue
+            if not items:
+                console.print(f":warning: No TikTok records returned for {descriptor}")
+                continue
+            datasets.append((descriptor, items))
+
+    deduped = dedupe_datasets(datasets)
+    total = sum(len(items) for _, items in datasets)
+    unique = sum(len(items) for _, items, _ in deduped)
+    sections = [
+        (d, section_markdown(d, items, repeats, markdown_options)) for d, items, repeats in deduped
+    ]
+    if not sections:
+        return []
+    console.print(
+        f"→ {unique} unique videos ({total - unique} duplicates dropped) from {len(sections)} descriptors"
+    )
 
-    markdown = items_to_markdown(descriptor, items)
-    console.print(f"→ formatted {len(items)} items into {len(markdown):,} characters")
+    title = "TikTok datasets: " + ", ".join(d for d, _ in sections)
+    docs = list(pack_sections(sections, max_doc_chars))
+    content_ids = upload_chunks(title, docs, lambda t, text: create_raw_content(t, text, senso_key))
+    console.print(f"→ uploaded {len(docs)} combined document(s): {', '.join(content_ids)}")
+
+    with console.status("[cyan]Waiting for Senso to index …[/cyan]"), span("senso.wait_indexed", "index"):
+        final = wait_for_indexing(content_ids, lambda cid: get_status(cid, senso_key), index_timeout)
+    failed = [cid for cid, status in final.items() if status == "failed"]
+    if failed:
+        console.print(f":x: Processing failed for {', '.join(failed)}")
+        return [cid for cid in content_ids if cid not in failed]
+    console.print(f":white_check_mark: Indexed {', '.join(content_ids)}")
+    if index is not None:
+        for descriptor, markdown in sections:
+            index.add(descriptor, descriptor, markdown, content_ids)
+    return content_ids
+
+
+class DescriptorPipeline:
+    """
+    Scrape every descriptor concurrently and upload each dataset as soon as
+    its own scrape finishes, while the others are still running.  All
+    uploads are tracked by one shared ``StatusPoller``, so Apify time and
+    Senso indexing time overlap instead of adding up.  A descriptor still
+    indexing ``index_timeout`` seconds after its own upload fails.
+    """
+
+    def __init__(
+        self,
+        jobs: List[Tuple[str, Dict[str, Any]]],
+        senso_key: str,
+        apify_token: str,
+        chunk_chars: int = 0,
+        index: Optional[Any] = None,
+        scrape_workers: int = 4,
+        upload_workers: int = 4,
+        markdown_options: Optional[Dict[str, Any]] = None,
+        shard_manifest: Optional[ShardManifest] = None,
+        shard_items: int = DEFAULT_SHARD_ITEMS,
+        index_timeout: float = INDEX_TIMEOUT,
+    ) -> None:
+        self.jobs = jobs
+        self.index_timeout = index_timeout
+        self.markdown_options = markdown_options
+        self.shard_manifest = shard_manifest  # set: stream each dataset in resumable shards
+        self.shard_items = shard_items
+        self.upload_workers = upload_workers
+        self.senso_key = senso_key
+        self.apify_token = apify_token
+        self.chunk_chars = chunk_chars
+        self.index = index
+        self.index_lock = threading.Lock()  # REPL searches while late datasets are added
+
+        self.scrapers = ThreadPoolExecutor(max(1, min(scrape_workers, len(jobs))))
+        self.uploaders = ThreadPoolExecutor(max(1, upload_workers))
+        self.poller = StatusPoller(lambda cid: get_status(cid, senso_key))
+
+        self.cond = threading.Condition()
+        self.indexed: Dict[str, List[str]] = {}  # descriptor -> content IDs, in completion order
+        self.failed: Dict[str, str] = {}  # descriptor -> reason
+        self.uploaded: Dict[str, List[str]] = {}
+        self.deadlines: Dict[str, threading.Timer] = {}
+
+    # ------------------------------------------------------------------ #
+    def start(self) -> "DescriptorPipeline":
+        self.poller.start()
+        for descriptor, actor_input in self.jobs:
+            console.print(f"[bold]Fetching TikTok data for:[/bold] {descriptor}")
+            if self.shard_manifest is not None:
+                fut = self.scrapers.submit(self._ingest_sharded, descriptor, actor_input)
+                fut.add_done_callback(lambda f, d=descriptor: self._on_sharded(d, f))
+                continue
+            fut = self.scrapers.submit(
+                scrape_descriptor, descriptor, actor_input, self.apify_token, self.markdown_options
+            )
+            fut.add_done_callback(lambda f, d=descriptor: self._on_scraped(d, f))
+        return self
+
+    def _finish(self, descriptor: str, content_ids: Optional[List[str]], reason: str = "") -> None:
+        with self.cond:
+            if descriptor in self.indexed or descriptor in self.failed:
+                return  # indexed after its deadline had already failed it
+            if content_ids is None:
+                self.failed[descriptor] = reason
+            else:
+                self.indexed[descriptor] = content_ids
+            timer = self.deadlines.pop(descriptor, None)
+            self.cond.notify_all()
+        if timer is not None:
+            timer.cancel()
+        if content_ids is None:
+            console.print(f":x: {descriptor}: {reason}")
+        else:
+            console.print(f":white_check_mark: {descriptor} indexed ({', '.join(content_ids)})")
+
+    def _expire(self, descriptor: str) -> None:
+        self._finish(descriptor, None, str(IndexTimeout(self.uploaded[descriptor])))
+
+    def _on_scraped(self, descriptor: str, fut: Future) -> None:
+        if fut.exception() is not None:
+            return self._finish(descriptor, None, f"scrape failed: {fut.exception()}")
+        markdown = fut.result()
+        if not markdown:
+            return self._finish(descriptor, None, "no records")
+        uploaded = self.uploaders.submit(
+            upload_markdown, descriptor, markdown, self.senso_key, self.chunk_chars
+        )
+        uploaded.add_done_callback(lambda f: self._on_uploaded(descriptor, markdown, f))
+
+    def _on_uploaded(self, descriptor: str, markdown: str, fut: Future) -> None:
+        if fut.exception() is not None:
+            return self._finish(descriptor, None, f"upload failed: {fut.exception()}")
+        content_ids = fut.result()
+        console.print(f"→ {descriptor}: uploaded as {', '.join(content_ids)}; indexing …")
+        self._track(descriptor, content_ids, markdown)
+
+    def _ingest_sharded(self, descriptor: str, actor_input: Dict[str, Any]) -> List[str]:
+        """Scrape via an async Apify run and upload its dataset page by page (resumable)."""
+        manifest = self.shard_manifest
+        entry = manifest.get(descriptor)
+        request = fingerprint(actor_input)
+        resumable = (
+            entry and entry.get("fingerprint") == request and entry.get("shard_items") == self.shard_items
+        )
+        if resumable:
+            status = get_apify_run(entry["run_id"], self.apify_token)["status"]
+            if status in APIFY_RUN_FAILED:  # resuming would fail the same way every time
+                console.print(f"→ {descriptor}: run {entry['run_id']} ended {status}; starting a new run")
+                resumable = False
+        if resumable:
+            console.print(
+                f"→ {descriptor}: resuming run {entry['run_id']} "
+                f"({len(entry['shards'])} shards already uploaded)"
+            )
+        else:
+            run = start_apify_run(actor_input, self.apify_token)
+            manifest.reset(
+                descriptor,
+                fingerprint=request,
+                shard_items=self.shard_items,
+                run_id=run["id"],
+                dataset_id=run["defaultDatasetId"],
+            )
+            entry = manifest.get(descriptor)
+        wait_apify_run(entry["run_id"], self.apify_token)
+
+        def on_uploaded(index: int, content_id: str, markdown: str) -> None:
+            console.print(f"→ {shard_title(descriptor, index)} uploaded as {content_id}")
+            if self.index is not None:
+                with self.index_lock:
+                    self.index.add(shard_title(descriptor, index), descriptor, markdown, [content_id])
+
+        return upload_shards(
+            descriptor,
+            descriptor,
+            lambda i: fetch_dataset_items(
+                entry["dataset_id"], self.apify_token, i * self.shard_items, self.shard_items
+            ),
+            lambda title, text: create_raw_content(title, text, self.senso_key),
+            manifest,
+            shard_items=self.shard_items,
+            workers=self.upload_workers,
+            markdown_options=self.markdown_options,
+            on_uploaded=on_uploaded,
+        )
 
-    console.print("Uploading to Senso …")
-    cid = create_raw_content(descriptor, markdown, senso_key)
-    console.print(f"→ content_id = {cid}")
-    wait_until_indexed(cid, senso_key)
-    return cid
+    def _on_sharded(self, descriptor: str, fut: Future) -> None:
+        if fut.exception() is not None:
+            return self._finish(descriptor, None, f"sharded ingest failed: {fut.exception()}")
+        content_ids = fut.result()
+        if not content_ids:
+            return self._finish(descriptor, None, "no records")
+        console.print(f"→ {descriptor}: {len(content_ids)} shards uploaded; indexing …")
+        self._track(descriptor, content_ids, None)
+
+    def _track(self, descriptor: str, content_ids: List[str], markdown: Optional[str]) -> None:
+        """Poll ``content_ids`` and finish ``descriptor`` once all are indexed."""
+        timer = threading.Timer(self.index_timeout, self._expire, (descriptor,))
+        timer.daemon = True
+        with self.cond:
+            self.uploaded[descriptor] = content_ids
+            self.deadlines[descriptor] = timer
+        timer.start()
+        started = time.perf_counter()
+
+        def on_part(content_id: str, status: str) -> None:
+            tracing.record("senso.wait_indexed", "index", started, content_id=content_id, status=status)
+            if self.shard_manifest is not None:
+                self.shard_manifest.mark_indexed(descriptor, content_id, status)
+
+        def on_indexed(content_id: str, status: str) -> None:
+            if status != "completed":
+                return self._finish(descriptor, None, f"processing failed for {content_id}")
+            with self.cond:
+                if descriptor in self.failed:
+                    return  # timed out before Senso finished
+            if self.index is not None and markdown is not None:
+                with self.index_lock:
+                    self.index.add(descriptor, descriptor, markdown, content_ids)
+            self._finish(descriptor, content_ids)
+
+        for content_id in content_ids:
+            self.poller.track(content_id, on_part)
+        self.poller.track_all(content_ids, on_indexed)
+
+    # ------------------------------------------------------------------ #
+    def done(self) -> bool:
+        return len(self.indexed) + len(self.failed) == len(self.jobs)
+
+    def wait(self, first: bool = False) -> List[str]:
+        """
+        Block until every descriptor is indexed or failed (or, with ``first``,
+        until one is indexed) and return the content IDs indexed so far.
+        Indexing deadlines run per descriptor from its upload, so a slow
+        scrape does not eat into the time Senso gets to index it.
+        """
+        with self.cond:
+            self.cond.wait_for(lambda: self.done() or (first and bool(self.indexed)))
+            return self.indexed_ids()
+
+    def indexed_ids(self) -> List[str]:
+        with self.cond:
+            return [cid for cids in self.indexed.values() for cid in cids]
+
+    def close(self) -> None:
+        """
+        Let in-flight scrapes and uploads finish and every uploaded descriptor
+        reach indexed or failed (each bounded by its deadline), then stop the
+        poller.
+        """
+        self.scrapers.shutdown(wait=True)
+        self.uploaders.shutdown(wait=True)
+        with self.cond:
+            self.cond.wait_for(self.done)
+        self.poller.stop()
+        with self.cond:
+            timers = list(self.deadlines.values())
+        for timer in timers:
+            timer.cancel()
 
 
 def main(args: argparse.Namespace) -> None:
@@ -292,18 +638,78 @@ def main(args: argparse.Namespace) -> None:
         console.print(":warning: Provide at least one profile, hashtag, or search query.")
         sys.exit(1)
 
-    content_ids = []
-    for descriptor, actor_input in zip(descriptors, actor_inputs):
-        cid = ingest_descriptor(descriptor, actor_input, senso_key, apify_token)
-        if cid:
-            content_ids.append(cid)
+    index = None
+    if args.local_index:
+        try:
+            from local_index import LocalIndex
+        except ImportError as exc:
+            console.print(f":warning: {exc}")
+            sys.exit(1)
+
+        index = LocalIndex.load(args.local_index)
+
+    jobs = list(zip(descriptors, actor_inputs))
+    markdown_options = {"payload": args.payload, "fields": parse_fields(args.payload_fields)}
+    pipeline: Optional[DescriptorPipeline] = None
+    index_lock = threading.Lock()
+    if args.consolidate:
+        try:
+            content_ids = ingest_consolidated(
+                jobs,
+                senso_key,
+                apify_token,
+                args.max_doc_chars,
+                index,
+                args.scrape_workers,
+                markdown_options,
+                args.index_timeout,
+            )
+        except IndexTimeout as exc:
+            console.print(f":x: {exc}")
+            content_ids = []
+    else:
+        pipeline = DescriptorPipeline(
+            jobs,
+            senso_key,
+            apify_token,
+            chunk_chars=args.chunk_chars,
+            index=index,
+            scrape_workers=args.scrape_workers,
+            upload_workers=args.upload_workers,
+            markdown_options=markdown_options,
+            shard_manifest=ShardManifest(args.shard_manifest) if args.shard_items else None,
+            shard_items=args.shard_items,
+            index_timeout=args.index_timeout,
+        ).start()
+        index_lock = pipeline.index_lock
+        content_ids = pipeline.wait(first=args.ready == "first")
 
     if not content_ids:
+        # Every descriptor has failed or timed out; nothing is left to wait for.
         console.print(":x: No content ingested; exiting.")
         sys.exit(1)
 
+    def save_index() -> None:
+        if index is not None:
+            with index_lock:
+                index.save(args.local_index)
+            console.print(f"→ local index: {len(index):,} passages in {args.local_index}")
+
+    background = pipeline is not None and not pipeline.done()
+    if not background:
+        if pipeline is not None:
+            pipeline.close()
+        save_index()
+    else:
+        console.print(
+            f"[dim]{len(pipeline.indexed)}/{len(descriptors)} datasets indexed; "
+            "the rest keep ingesting in the background.[/dim]"
+        )
+
     console.print("\n[bold green]Ready![/bold green] Ask me anything "
                   "(type 'exit' to quit).\n")
+    if index is not None:
+        console.print("Answers come from the local index; start a question with ! to ask Senso.\n")
     while True:
         try:
             q = console.input("[bold blue]> [/bold blue]").strip()
@@ -312,9 +718,21 @@ def main(args: argparse.Namespace) -> None:
             break
         if not q or q.lower() in ("exit", "quit"):
             break
-        payload = ask_question(q, senso_key)
+        payload = None
+        if index is not None and not q.startswith("!"):
+            with index_lock:
+                hits = index.search(q, k=5)
+            if hits:
+                payload = {"answer": "(local keyword hits — prefix with ! for a Senso answer)",
+                           "results": hits}
+        if payload is None:
+            payload = ask_question(q.lstrip("!").strip(), senso_key)
         render_answer(payload)
 
+    if background:
+        console.print("Waiting for background ingestion to finish …")
+        pipeline.close()
+        save_index()
     console.print("Goodbye 👋")
 
 
@@ -331,4 +749,90 @@ if __name__ == "__main__":
         default=5,
         help="Number of videos to fetch per descriptor (1-1000000).",
     )
-    main(parser.parse_args())
+    parser.add_argument(
+        "--consolidate",
+        action="store_true",
+        help="Merge all descriptors (videos deduplicated by id) into one combined document "
+        "so the run waits on a single indexing job.",
+    )
+    parser.add_argument(
+        "--max-doc-chars",
+        type=int,
+        default=0,
+        help="With --consolidate, cap each combined document at this many characters "
+        "(0 = one document).",
+    )
+    parser.add_argument(
+        "--shard-items",
+        type=int,
+        default=0,
+        help="Stream each dataset from Apify in shards of this many videos, uploaded in "
+        f"parallel (e.g. {DEFAULT_SHARD_ITEMS}); for very large --results-per.",
+    )
+    parser.add_argument(
+        "--shard-manifest",
+        default="tiktok_shards.json",
+        help="Where sharded runs record progress; rerun with the same file to resume.",
+    )
+    parser.add_argument(
+        "--ready",
+        choices=("all", "first"),
+        default="all",
+        help="Open the prompt once all datasets are indexed, or as soon as the first one is.",
+    )
+    parser.add_argument(
+        "--index-timeout",
+        type=float,
+        default=INDEX_TIMEOUT,
+        help="Fail a dataset still being indexed this many seconds after its upload.",
+    )
+    parser.add_argument(
+        "--scrape-workers", type=int, default=4, help="Concurrent Apify scrapes."
+    )
+    parser.add_argument(
+        "--upload-workers", type=int, default=4, help="Concurrent Senso uploads."
+    )
+    parser.add_argument(
+        "--local-index",
+        metavar="PATH",
+        help="Also index the datasets offline (BM25, needs numpy) at PATH and answer from it first.",
+    )
+    parser.add_argument(
+        "--payload",
+        choices=PAYLOAD_MODES,
+        default="pretty",
+        help="Structured JSON block appended to each dataset: pretty (indented array), "
+        "compact (one object per line; smaller, faster) or none.",
+    )
+    parser.add_argument(
+        "--payload-fields",
+        help="Comma-separated item fields for the JSON block, e.g. text,videoMeta.duration "
+        "(default: video metadata, media URLs and caption).",
+    )
+    parser.add_argument(
+        "--chunk-chars",
+        type=int,
+        default=0,
+        help="Split datasets larger than this many characters into parts uploaded in parallel.",
+    )
+    parser.add_argument(
+        "--trace",
+        nargs="?",
+        const="tiktok_search_trace.json",
+        metavar="PATH",
+        help="Trace every stage and HTTP call; write a Chrome-trace timeline to PATH "
+        "(default tiktok_search_trace.json) and print a per-stage summary.",
+    )
+    cli_args = parser.parse_args()
+    if cli_args.shard_items and cli_args.consolidate:
+        parser.error("--shard-items and --consolidate cannot be combined")
+    if cli_args.trace:
+        tracing.enable()
+    try:
+        main(cli_args)
+    finally:
+        tracer = tracing.disable()
+        if tracer is not None:
+            tracer.write(cli_args.trace)
+            console.print(tracer.summary_table())
+            console.print(f"→ timeline written to {cli_args.trace} (open in https://ui.perfetto.dev)")
@@ -0,0 +1,212 @@
+"""
+Serialize Apify TikTok dataset items into markdown for Senso ingestion.
+
+Shared by the TikTok CLIs.  ``iter_markdown`` is a generator that yields one
+block per video, so callers can stream straight to a file, to
+``chunking.split_markdown`` or into shards without building the whole
+document.  Each video gets a section in one of two layouts: ``bullets``
+(the search CLI's, caption as a bullet) or ``caption`` (the repurposer's,
+caption as a paragraph).  The document ends with a "Structured Payload"
+JSON block of projected fields:
+
+- ``pretty`` (default): the ``json.dumps(indent=2)`` array both CLIs have
+  always uploaded.
+- ``compact``: one JSON object per line, encoded with orjson when it is
+  installed (``pip install orjson``), else the stdlib ``json``; smaller and
+  faster, but a different document in Senso.
+- ``none``: no payload block.
+
+Usage:
+  markdown = items_to_markdown("Profile tiktok", items)
+  with open("dataset.md", "w") as fh:
+      write_markdown(fh, "Profile tiktok", items, fields=("text", "videoMeta.duration"))
+"""
+
+from __future__ import annotations
+
+import json
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+PAYLOAD_MODES = ("pretty", "compact", "none")
+LAYOUTS = ("bullets", "caption")
+PAYLOAD_BATCH = 1000  # compact records decoded and yielded per piece
+DEFAULT_FIELDS = (
+    "videoMeta.coverUrl",
+    "videoMeta.duration",
+    "videoMeta.definition",
+    "videoMeta.format",
+    "videoMeta.height",
+    "videoMeta.width",
+    "videoMeta.downloadAddr",
+    "mediaUrls",
+    "text",
+)
+STAT_FIELDS = (
+    ("likes", "diggCount"),
+    ("comments", "commentCount"),
+    ("shares", "shareCount"),
+    ("plays", "playCount"),
+    ("collects", "collectCount"),
+)
+
+
+def _compact_encoder() -> Callable[[Any], bytes]:
+    if orjson is not None:
+        return orjson.dumps
+    encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    return lambda obj: encoder.encode(obj).encode("utf-8")
+
+
+def parse_fields(spec: Optional[str]) -> Sequence[str]:
+    """``"text,videoMeta.duration"`` -> field tuple; empty/None -> ``DEFAULT_FIELDS``."""
+    fields = tuple(f.strip() for f in (spec or "").split(",") if f.strip())
+    return fields or DEFAULT_FIELDS
+
+
+@lru_cache(maxsize=32)
+def _paths(fields: Tuple[str, ...]) -> Tuple[Tuple[str, Tuple[str, ...]], ...]:
+    return tuple((field, tuple(field.split("."))) for field in fields)
+
+
+def project(item: Dict[str, Any], fields: Sequence[str]) -> Dict[str, Any]:
+    """Pick dotted ``fields`` (e.g. ``videoMeta.duration``) out of an item."""
+    record: Dict[str, Any] = {}
+    for field, keys in _paths(tuple(fields)):
+        value: Any = item
+        for key in keys:
+            value = value.get(key) if isinstance(value, dict) else None
+        if field == "text":
+            value = (value or "").strip() or "<no caption>"
+        elif field == "mediaUrls":
+            value = value or []
+        record[field] = value
+    return record
+
+
+def video_markdown(idx: int, item: Dict[str, Any]) -> str:
+    """The markdown section for one video (ends with a blank line)."""
+    author = item.get("authorMeta") or {}
+    author_name = author.get("nickName") or author.get("name") or "unknown author"
+    handle = author.get("name") or ""
+    video_meta = item.get("videoMeta") or {}
+    download_url = video_meta.get("downloadAddr")
+    published = item.get("createTimeISO") or str(item.get("createTime") or "unknown")
+    caption = (item.get("text") or "").strip() or "<no caption>"
+
+    lines = [
+        f"## Video {idx} — {item.get('id', 'unknown')}",
+        f"- Author: {author_name} (@{handle})" if handle else f"- Author: {author_name}",
+        f"- Published: {published}",
+        f"- TikTok URL: {item.get('webVideoUrl') or author.get('profileUrl') or 'n/a'}",
+    ]
+    if download_url:
+        lines.append(f"- Download URL: {download_url}")
+    lines.extend(f"- Media URL: {media}" for media in item.get("mediaUrls") or [] if media)
+    lines.append(f"- Caption: {caption}")
+    hashtags = ", ".join(f"#{h['name']}" for h in item.get("hashtags") or [] if h.get("name"))
+    if hashtags:
+        lines.append(f"- Hashtags: {hashtags}")
+    stats = [f"{label}={item[key]}" for label, key in STAT_FIELDS if isinstance(item.get(key), int)]
+    if stats:
+        lines.append(f"- Stats: {', '.join(stats)}")
+    music = item.get("musicMeta")
+    if music:
+        lines.append(
+            f"- Music: {music.get('musicName') or 'n/a'} by {music.get('musicAuthor') or 'unknown'}"
+        )
+    lines.append("\n")
+    return "\n".join(lines)
+
+
+def caption_markdown(idx: int, item: Dict[str, Any]) -> str:
+    """The repurposer's section for one video: bullets, then the caption as a paragraph."""
+    author = item.get("authorMeta") or {}
+    author_name = author.get("nickName") or author.get("name") or "unknown author"
+    handle = author.get("name") or ""
+    video_meta = item.get("videoMeta") or {}
+    download_url = video_meta.get("downloadAddr")
+    published = item.get("createTimeISO") or str(item.get("createTime") or "unknown")
+    caption = (item.get("text") or "").strip() or "<no caption>"
+
+    lines = [
+        f"## Video {idx} — {item.get('id', 'unknown')}",
+        f"- Author: {author_name} (@{handle})" if handle else f"- Author: {author_name}",
+        f"- Published: {published}",
+        f"- TikTok URL: {item.get('webVideoUrl') or author.get('profileUrl') or 'n/a'}",
+    ]
+    if download_url:
+        lines.append(f"- Download URL: {download_url}")
+    lines.extend(f"- Media URL: {media}" for media in item.get("mediaUrls") or [] if media)
+    stats = [f"{label}={item[key]}" for label, key in STAT_FIELDS[:4] if isinstance(item.get(key), int)]
+    if stats:
+        lines.append(f"- Stats: {', '.join(stats)}")
+    hashtags = ", ".join(f"#{h['name']}" for h in item.get("hashtags") or [] if h.get("name"))
+    if hashtags:
+        lines.append(f"- Hashtags: {hashtags}")
+    lines.extend(["", caption, "\n"])
+    return "\n".join(lines)
+
+
+def iter_markdown(
+    descriptor: str,
+    items: Iterable[Dict[str, Any]],
+    payload: str = "pretty",
+    fields: Sequence[str] = DEFAULT_FIELDS,
+    start: int = 1,
+    heading: bool = True,
+    layout: str = "bullets",
+) -> Iterator[str]:
+    """
+    Yield the document in pieces: the heading, one block per video, then the
+    structured payload.  Only the projected payload records are buffered
+    (as compact UTF-8 bytes; emitted in batches of ``PAYLOAD_BATCH``).
+    ``start`` numbers videos when a dataset is serialized in several shards.
+    """
+    if payload not in PAYLOAD_MODES:
+        raise ValueError(f"payload must be one of {', '.join(PAYLOAD_MODES)}")
+    if layout not in LAYOUTS:
+        raise ValueError(f"layout must be one of {', '.join(LAYOUTS)}")
+    section = caption_markdown if layout == "caption" else video_markdown
+    if heading:
+        yield f"# TikTok dataset for {descriptor}\n\n"
+    encode = _compact_encoder() if payload == "compact" else None
+    records: List[Any] = []
+    for idx, item in enumerate(items, start=start):
+        yield section(idx, item)
+        if payload == "compact":
+            records.append(encode(project(item, fields)))
+        elif payload == "pretty":
+            records.append(project(item, fields))
+
+    if not records:
+        return
+    yield "### Structured Payload\n```json\n"
+    if payload == "pretty":
+        yield json.dumps(records, indent=2) + "\n```\n"
+        return
+    yield "[\n"
+    for i in range(0, len(records), PAYLOAD_BATCH):
+        last = i + PAYLOAD_BATCH >= len(records)
+        yield b",\n".join(records[i:i + PAYLOAD_BATCH]).decode("utf-8") + ("\n" if last else ",\n")
+    yield "]\n```\n"
+
+
+def items_to_markdown(descriptor: str, items: Iterable[Dict[str, Any]], **options: Any) -> str:
+    """Whole document as one string (see ``iter_markdown`` for options)."""
+    return "".join(iter_markdown(descriptor, items, **options)).strip()
+
+
+def write_markdown(
+    fh: TextIO, descriptor: str, items: Iterable[Dict[str, Any]], **options: Any
+) -> int:
+    """Stream the document to ``fh``; returns the number of characters written."""
+    written = 0
+    for piece in iter_markdown(descriptor, items, **options):
+        written += fh.write(piece)
+    return written
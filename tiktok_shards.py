@@ -0,0 +1,127 @@
+"""
+Sharded, resumable uploads for very large TikTok datasets.
+
+Items are pulled ``shard_items`` at a time (one dataset page per shard),
+serialized with ``tiktok_markdown`` and uploaded as ``"<descriptor> (shard
+N)"`` with bounded parallelism, so only the shards in flight are in memory.
+Every uploaded shard is recorded in a ``ShardManifest``; rerunning with the
+same manifest skips recorded shards and continues from the first missing
+one.  Only an empty page ends the dataset: a page can come back short
+before the end when the API filters out empty items.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from json_store import JsonStore
+from tiktok_markdown import items_to_markdown
+from tracing import span
+
+DEFAULT_SHARD_ITEMS = 5_000
+
+# fetch_shard(index) -> items of shard ``index`` ([] once the dataset is exhausted)
+ShardFetcher = Callable[[int], List[Dict[str, Any]]]
+
+
+def shard_title(descriptor: str, index: int) -> str:
+    return f"{descriptor} (shard {index + 1})"
+
+
+def fingerprint(actor_input: Dict[str, Any]) -> str:
+    """Stable hash of a scrape request, so a changed request starts a fresh dataset."""
+    return hashlib.sha256(json.dumps(actor_input, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+class ShardManifest(JsonStore):
+    """
+    Per-descriptor record of the Apify run/dataset being sharded and of each
+    uploaded shard (content_id, item count, indexing status).
+    """
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            entry = self.entries.get(key)
+            return json.loads(json.dumps(entry)) if entry else None
+
+    def reset(self, key: str, **fields: Any) -> None:
+        with self.lock:
+            self.entries[key] = {**fields, "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "shards": {}}
+            self.save()
+
+    def record_shard(self, key: str, index: int, **fields: Any) -> None:
+        with self.lock:
+            self.entries[key]["shards"].setdefault(str(index), {}).update(fields)
+            self.save()
+
+    def mark_indexed(self, key: str, content_id: str, status: str) -> None:
+        with self.lock:
+            for shard in self.entries.get(key, {}).get("shards", {}).values():
+                if shard.get("content_id") == content_id:
+                    shard["status"] = status
+                    self.save()
+                    return
+
+
+def upload_shards(
+    key: str,
+    descriptor: str,
+    fetch_shard: ShardFetcher,
+    upload: Callable[[str, str], str],
+    manifest: ShardManifest,
+    shard_items: int = DEFAULT_SHARD_ITEMS,
+    workers: int = 4,
+    markdown_options: Optional[Dict[str, Any]] = None,
+    on_uploaded: Optional[Callable[[int, str, str], None]] = None,
+) -> List[str]:
+    """
+    Fetch, serialize and upload every shard not yet recorded under ``key``
+    and return all shard content IDs in order.  At most ``2 * workers``
+    shards are in memory.  ``on_uploaded(index, content_id, markdown)``
+    fires for each newly uploaded shard.
+    """
+    recorded = (manifest.get(key) or {}).get("shards", {})
+    slots = threading.BoundedSemaphore(2 * workers)
+
+    failed = threading.Event()
+
+    def send(index: int, items: List[Dict[str, Any]]) -> str:
+        try:
+            title = shard_title(descriptor, index)
+            with span("markdown", "markdown", descriptor=title, items=len(items)):
+                markdown = items_to_markdown(
+                    title, items, start=index * shard_items + 1, **(markdown_options or {})
+                )
+            content_id = upload(title, markdown)
+            manifest.record_shard(key, index, content_id=content_id, items=len(items), status="uploaded")
+            if on_uploaded:
+                on_uploaded(index, content_id, markdown)
+            return content_id
+        except Exception:
+            failed.set()  # stop fetching; recorded shards are kept for the next run
+            raise
+        finally:
+            slots.release()
+
+    results: List[Any] = []
+    with ThreadPoolExecutor(workers) as pool:
+        index = 0
+        while not failed.is_set():
+            shard = recorded.get(str(index))
+            if shard and shard.get("content_id"):
+                results.append(shard["content_id"])
+                index += 1
+                continue
+            slots.acquire()
+            items = fetch_shard(index)
+            if not items:
+                slots.release()
+                break
+            results.append(pool.submit(send, index, items))
+            index += 1  # a short page is not the end: clean=true drops items mid-dataset
+    return [r if isinstance(r, str) else r.result() for r in results]
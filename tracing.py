@@ -0,0 +1,295 @@
+"""
+Span tracing for the TikTok CLI pipelines.
+
+Code marks its stages with ``span(name, stage)``.  While tracing is enabled
+(``enable()``; the CLIs' ``--trace`` flag) every span is recorded with its
+thread and timing, and every ``requests`` call made inside one is recorded
+as a nested HTTP span carrying bytes sent/received, status and retry count.
+Retries are only those that really happened: calls the caller made inside
+``retrying()`` (e.g. the poller re-requesting a status after an error),
+plus any retries urllib3 made internally.
+``Tracer.write`` saves a Chrome trace (open it in chrome://tracing or
+https://ui.perfetto.dev); ``Tracer.summary_table`` aggregates per stage.
+When tracing is disabled ``span`` does nothing.
+
+Usage:
+  tracer = enable()
+  with span("apify.run", "apify", descriptor="Profile tiktok") as info:
+      info["items"] = len(items)
+  disable()
+  tracer.write("trace.json")
+  console.print(tracer.summary_table())
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+_local = threading.local()  # per-thread stack of open stages
+_tracer: Optional["Tracer"] = None
+
+
+def _stages() -> List[str]:
+    if not hasattr(_local, "stages"):
+        _local.stages = []
+    return _local.stages
+
+
+def _body_len(body: Any) -> int:
+    if body is None:
+        return 0
+    if isinstance(body, str):
+        return len(body.encode("utf-8"))
+    try:
+        return len(body)
+    except TypeError:  # generator/file upload
+        return 0
+
+
+def _union_seconds(intervals: List[Tuple[float, float]]) -> float:
+    """Total time covered by possibly overlapping ``(start, end)`` intervals."""
+    covered = 0.0
+    reach = float("-inf")
+    for start, end in sorted(intervals):
+        if end <= reach:
+            continue
+        covered += end - max(start, reach)
+        reach = end
+    return covered
+
+
+class Tracer:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.origin = time.perf_counter()
+        self.events: List[Dict[str, Any]] = []
+        self.threads: Dict[int, str] = {}
+        self._restore: Optional[Callable[[], None]] = None
+
+    # ------------------------------------------------------------------ #
+    def _us(self, t: float) -> float:
+        return (t - self.origin) * 1e6
+
+    def record(self, name: str, stage: str, started: float, ended: float, args: Dict[str, Any]) -> None:
+        """Add a span from two ``time.perf_counter()`` readings."""
+        thread = threading.current_thread()
+        event = {
+            "name": name,
+            "cat": stage,
+            "ph": "X",
+            "ts": round(self._us(started), 1),
+            "dur": round((ended - started) * 1e6, 1),
+            "pid": os.getpid(),
+            "tid": thread.ident,
+            "args": args,
+        }
+        with self.lock:
+            self.events.append(event)
+            self.threads.setdefault(thread.ident, thread.name)
+
+    @contextmanager
+    def span(self, name: str, stage: str, **args: Any) -> Iterator[Dict[str, Any]]:
+        stages = _stages()
+        stages.append(stage)
+        started = time.perf_counter()
+        try:
+            yield args
+        except BaseException as exc:
+            args["error"] = repr(exc)[:200]
+            raise
+        finally:
+            stages.pop()
+            self.record(name, stage, started, time.perf_counter(), args)
+
+    # ------------------------------------------------------------------ #
+    def instrument_requests(self) -> None:
+        """Record every ``requests`` call (all go through ``Session.send``)."""
+        import requests
+
+        original = requests.Session.send
+        tracer = self
+
+        def send(session: Any, request: Any, **kwargs: Any) -> Any:
+            url = urlsplit(request.url)
+            endpoint = f"{request.method} {url.netloc}{url.path}"  # no query: it may hold tokens
+            stages = _stages()
+            args: Dict[str, Any] = {
+                "http": True,
+                "method": request.method,
+                "url": f"{url.scheme}://{url.netloc}{url.path}",
+                "bytes_sent": _body_len(request.body),
+                "bytes_received": 0,
+                "retries": int(getattr(_local, "retrying", False)),
+            }
+            started = time.perf_counter()
+            failed = True
+            try:
+                resp = original(session, request, **kwargs)
+                args["status"] = resp.status_code
+                if kwargs.get("stream"):
+                    args["bytes_received"] = int(resp.headers.get("Content-Length") or 0)
+                else:
+                    args["bytes_received"] = len(resp.content)
+                history = getattr(getattr(resp.raw, "retries", None), "history", None) or ()
+                args["retries"] += len(history)
+                failed = resp.status_code >= 400
+                return resp
+            except Exception as exc:
+                args["error"] = repr(exc)[:200]
+                raise
+            finally:
+                args["failed"] = failed
+                stage = stages[-1] if stages else "other"
+                tracer.record(endpoint, stage, started, time.perf_counter(), args)
+
+        requests.Session.send = send
+        self._restore = lambda: setattr(requests.Session, "send", original)
+
+    def uninstrument(self) -> None:
+        if self._restore is not None:
+            self._restore()
+            self._restore = None
+
+    # ------------------------------------------------------------------ #
+    def summary(self) -> List[Dict[str, Any]]:
+        """
+        One row per stage, in order of first activity: span count, failed
+        spans, wall time (overlapping spans counted once), summed span time,
+        and HTTP calls, bytes, retries and failed (error or 4xx/5xx) calls.
+        """
+        with self.lock:
+            events = list(self.events)
+        rows: Dict[str, Dict[str, Any]] = {}
+        intervals: Dict[str, List[Tuple[float, float]]] = {}
+        for event in sorted(events, key=lambda e: e["ts"]):
+            row = rows.setdefault(event["cat"], {
+                "stage": event["cat"], "spans": 0, "failed": 0, "wall": 0.0, "busy": 0.0,
+                "http_calls": 0, "bytes_sent": 0, "bytes_received": 0, "retries": 0, "http_errors": 0,
+            })
+            args = event["args"]
+            if args.get("http"):
+                row["http_calls"] += 1
+                row["bytes_sent"] += args["bytes_sent"]
+                row["bytes_received"] += args["bytes_received"]
+                row["retries"] += args["retries"]
+                row["http_errors"] += int(args["failed"])
+            else:
+                row["spans"] += 1
+                row["busy"] += event["dur"] / 1e6
+                if "error" in args:
+                    row["failed"] += 1
+            intervals.setdefault(event["cat"], []).append(
+                (event["ts"] / 1e6, (event["ts"] + event["dur"]) / 1e6)
+            )
+        for stage, row in rows.items():
+            row["wall"] = _union_seconds(intervals[stage])
+        return list(rows.values())
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.origin
+
+    def summary_table(self) -> Any:
+        """``summary()`` as a rich ``Table``."""
+        from rich.table import Table
+
+        total = self.elapsed()
+        table = Table(title=f"Trace ({total:.1f} s)", header_style="bold magenta")
+        for column in ("Stage", "Spans", "Failed", "Wall s", "%", "Busy s", "HTTP",
+                       "Sent", "Recv", "Retries", "HTTP err"):
+            table.add_column(column, justify="left" if column == "Stage" else "right", no_wrap=True)
+        for row in self.summary():
+            table.add_row(
+                row["stage"],
+                str(row["spans"]),
+                str(row["failed"]),
+                f"{row['wall']:.2f}",
+                f"{row['wall'] / total:.0%}" if total else "-",
+                f"{row['busy']:.2f}",
+                str(row["http_calls"]),
+                _human_bytes(row["bytes_sent"]),
+                _human_bytes(row["bytes_received"]),
+                str(row["retries"]),
+                str(row["http_errors"]),
+            )
+        return table
+
+    def write(self, path: str) -> None:
+        """Save the timeline in Chrome trace event format."""
+        with self.lock:
+            events = list(self.events)
+            threads = dict(self.threads)
+        meta = [
+            {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": name}}
+            for tid, name in threads.items()
+        ]
+        trace = {
+            "traceEvents": meta + events,
+            "displayTimeUnit": "ms",
+            "otherData": {"elapsed_seconds": round(self.elapsed(), 3), "summary": self.summary()},
+        }
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(trace, fh)
+
+
+def _human_bytes(n: int) -> str:
+    for unit in ("B", "KB", "MB"):
+        if n < 1024:
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} GB"
+
+
+# --------------------------------------------------------------------------- #
+# Module-level switch used by the CLIs                                        #
+# --------------------------------------------------------------------------- #
+def enable() -> Tracer:
+    """Start recording spans and HTTP calls; returns the active tracer."""
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer()
+        _tracer.instrument_requests()
+    return _tracer
+
+
+def disable() -> Optional[Tracer]:
+    """Stop recording and return the tracer that was active (if any)."""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer is not None:
+        tracer.uninstrument()
+    return tracer
+
+
+@contextmanager
+def retrying(active: bool = True) -> Iterator[None]:
+    """Count the HTTP calls made inside as retries of an earlier failed attempt."""
+    previous = getattr(_local, "retrying", False)
+    _local.retrying = active
+    try:
+        yield
+    finally:
+        _local.retrying = previous
+
+
+@contextmanager
+def span(name: str, stage: str, **args: Any) -> Iterator[Dict[str, Any]]:
+    """Record a span on the active tracer; yields ``args`` so callers can add fields."""
+    tracer = _tracer
+    if tracer is None:
+        yield args
+        return
+    with tracer.span(name, stage, **args) as fields:
+        yield fields
+
+
+def record(name: str, stage: str, started: float, **args: Any) -> None:
+    """Record a span that started at ``started`` (``time.perf_counter()``) and ends now."""
+    tracer = _tracer
+    if tracer is not None:
+        tracer.record(name, stage, started, time.perf_counter(), args)
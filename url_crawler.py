@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Bounded, polite crawler that builds URL lists for ingest_urls.py.
+
+Seeds come from start URLs and/or sitemap.xml files (sitemap indexes are
+followed). Links are followed breadth-first up to ``max_depth`` and
+``max_pages``, only on allowed domains, only where robots.txt permits, and
+with at most ``per_host`` concurrent requests and ``delay`` seconds between
+request starts per host.  With ``keep_pages`` the HTML of every page visited
+is kept in ``Crawler.pages`` so callers need not download it again.
+
+Usage:
+  python url_crawler.py https://docs.senso.ai/ --max-depth 2
+  python url_crawler.py --sitemap https://docs.senso.ai/sitemap.xml > urls.txt
+"""
+
+from __future__ import annotations
+
+import argparse
+import threading
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import urldefrag, urljoin, urlsplit
+from urllib.robotparser import RobotFileParser
+
+import requests
+
+USER_AGENT = "senso-ingest-bot/0.1 (+https://senso.ai)"
+SKIP_EXTENSIONS = (
+    ".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp", ".ico", ".pdf", ".zip",
+    ".gz", ".mp4", ".mp3", ".css", ".js", ".json", ".xml", ".woff", ".woff2",
+)
+
+# fetch(url) -> (status_code, content_type, body)
+Fetcher = Callable[[str], Tuple[int, str, str]]
+
+
+def http_fetch(url: str, timeout: int = 30) -> Tuple[int, str, str]:
+    resp = requests.get(url, headers={"User-Agent": USER_AGENT}, timeout=timeout)
+    return resp.status_code, resp.headers.get("Content-Type", ""), resp.text
+
+
+def normalize_url(url: str, base: str = "") -> Optional[str]:
+    """Resolve against ``base``, drop the fragment, keep only http(s) pages."""
+    url, _ = urldefrag(urljoin(base, url.strip()))
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.netloc:
+        return None
+    if parts.path.lower().endswith(SKIP_EXTENSIONS):
+        return None
+    path = parts.path or "/"
+    query = f"?{parts.query}" if parts.query else ""
+    return f"{parts.scheme}://{parts.netloc.lower()}{path}{query}"
+
+
+def extract_links(html: str, base: str) -> List[str]:
+    from bs4 import BeautifulSoup, SoupStrainer
+
+    soup = BeautifulSoup(html, "html.parser", parse_only=SoupStrainer("a"))
+    links = []
+    for anchor in soup.find_all("a", href=True):
+        if "nofollow" in (anchor.get("rel") or []):
+            continue
+        url = normalize_url(anchor["href"], base)
+        if url:
+            links.append(url)
+    return links
+
+
+def parse_sitemap(xml_text: str, base: str = "") -> Tuple[List[str], List[str]]:
+    """
+    Return ``(page_urls, nested_sitemap_urls)`` from a urlset or sitemapindex;
+    relative ``<loc>`` values are resolved against ``base`` (the sitemap URL).
+    """
+    root = ET.fromstring(xml_text.encode("utf-8"))
+    locs = [urljoin(base, el.text.strip()) for el in root.iter() if el.tag.endswith("loc") and el.text]
+    if root.tag.endswith("sitemapindex"):
+        return [], locs
+    return locs, []
+
+
+class HostGate:
+    """Per-host concurrency limit plus a minimum gap between request starts."""
+
+    def __init__(self, per_host: int, delay: float) -> None:
+        self.per_host = per_host
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.slots: Dict[str, threading.Semaphore] = {}
+        self.next_start: Dict[str, float] = {}
+        self.delays: Dict[str, float] = {}
+
+    def set_delay(self, host: str, delay: float) -> None:
+        with self.lock:
+            self.delays[host] = max(delay, self.delay)
+
+    def run(self, host: str, fn: Callable[[], Tuple[int, str, str]]) -> Tuple[int, str, str]:
+        with self.lock:
+            slot = self.slots.setdefault(host, threading.Semaphore(self.per_host))
+        with slot:
+            with self.lock:
+                now = time.monotonic()
+                start = max(now, self.next_start.get(host, now))
+                self.next_start[host] = start + self.delays.get(host, self.delay)
+            time.sleep(max(0.0, start - now))
+            return fn()
+
+
+class Crawler:
+    def __init__(
+        self,
+        max_depth: int = 2,
+        max_pages: int = 200,
+        allowed_domains: Optional[Iterable[str]] = None,
+        workers: int = 8,
+        per_host: int = 2,
+        delay: float = 0.5,
+        respect_robots: bool = True,
+        fetch: Fetcher = http_fetch,
+        keep_pages: bool = False,
+    ) -> None:
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.allowed_domains: Set[str] = {d.lower() for d in allowed_domains or []}
+        self.workers = workers
+        self.respect_robots = respect_robots
+        self.fetch = fetch
+        self.gate = HostGate(per_host, delay)
+        self.keep_pages = keep_pages
+        self.pages: Dict[str, str] = {}  # url -> HTML, filled when keep_pages
+        # host -> robots.txt being loaded or loaded; the lock only guards the
+        # dict, so a slow robots.txt holds up its own host and no other.
+        self.robots: Dict[str, Future] = {}
+        self.robots_lock = threading.Lock()
+
+    def _host(self, url: str) -> str:
+        return urlsplit(url).netloc
+
+    def _get(self, url: str) -> Tuple[int, str, str]:
+        return self.gate.run(self._host(url), lambda: self.fetch(url))
+
+    def allowed(self, url: str) -> bool:
+        host = self._host(url)
+        if self.allowed_domains and not any(
+            host == d or host.endswith(f".{d}") for d in self.allowed_domains
+        ):
+            return False
+        if not self.respect_robots:
+            return True
+        with self.robots_lock:
+            loading = self.robots.get(host)
+            owner = loading is None
+            if owner:
+                loading = self.robots[host] = Future()
+        if owner:
+            try:
+                loading.set_result(self._load_robots(url))
+            except BaseException as exc:
+                loading.set_exception(exc)
+                raise
+        robots = loading.result()
+        return robots is None or robots.can_fetch(USER_AGENT, url)
+
+    def _load_robots(self, url: str) -> Optional[RobotFileParser]:
+        parts = urlsplit(url)
+        robots_url = f"{parts.scheme}://{parts.netloc}/robots.txt"
+        try:
+            status, _, body = self._get(robots_url)
+        except requests.RequestException:
+            return None
+        if status >= 400:
+            return None  # no robots.txt: everything allowed
+        robots = RobotFileParser(robots_url)
+        robots.parse(body.splitlines())
+        crawl_delay = robots.crawl_delay(USER_AGENT)
+        if crawl_delay:
+            self.gate.set_delay(parts.netloc, float(crawl_delay))
+        return robots
+
+    def sitemap_urls(self, sitemap_url: str, max_sitemaps: int = 50) -> List[str]:
+        pages: List[str] = []
+        queue, seen = [sitemap_url], set()
+        while queue and len(seen) < max_sitemaps:
+            url = queue.pop(0)
+            if url in seen:
+                continue
+            seen.add(url)
+            try:
+                status, _, body = self._get(url)
+                if status >= 400:
+                    continue
+                found, nested = parse_sitemap(body, url)
+            except (requests.RequestException, ET.ParseError):
+                continue  # one unreachable or malformed sitemap should not end the crawl
+            pages.extend(found)
+            queue.extend(nested)
+        return pages
+
+    def _visit(self, url: str) -> List[str]:
+        try:
+            status, content_type, body = self._get(url)
+        except requests.RequestException:
+            return []
+        if status >= 400 or "html" not in content_type.lower():
+            return []
+        if self.keep_pages:
+            self.pages[url] = body
+        # robots.txt for newly seen hosts is loaded here, on the worker threads
+        return [link for link in extract_links(body, url) if self.allowed(link)]
+
+    def crawl(self, seeds: Iterable[str] = (), sitemaps: Iterable[str] = ()) -> List[str]:
+        """
+        Return the deduplicated, allowed URLs reachable from ``seeds`` and
+        ``sitemaps``, in breadth-first order, capped at ``max_pages``.
+        """
+        start = [url for url in map(normalize_url, seeds) if url]
+        if not self.allowed_domains:
+            self.allowed_domains = {self._host(url) for url in start}
+        for sitemap in sitemaps:
+            if not self.allowed_domains:
+                self.allowed_domains.add(self._host(sitemap))
+            start.extend(url for url in map(normalize_url, self.sitemap_urls(sitemap)) if url)
+
+        found: List[str] = []
+        seen: Set[str] = set()
+        frontier: List[str] = []
+        with ThreadPoolExecutor(self.workers) as pool:
+            for url, ok in zip(start, pool.map(self.allowed, start)):
+                if ok and url not in seen:
+                    seen.add(url)
+                    frontier.append(url)
+
+            depth = 0
+            while frontier and len(found) < self.max_pages:
+                frontier = frontier[: self.max_pages - len(found)]
+                found.extend(frontier)
+                if depth >= self.max_depth:
+                    break
+                next_frontier: List[str] = []
+                for links in pool.map(self._visit, frontier):
+                    for link in links:
+                        if link not in seen:
+                            seen.add(link)
+                            next_frontier.append(link)
+                frontier = next_frontier
+                depth += 1
+        return found
+
+
+def add_crawl_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--sitemap", action="append", default=[], help="sitemap.xml (or sitemap index) to seed from."
+    )
+    parser.add_argument("--max-depth", type=int, default=2, help="Link hops to follow from seeds.")
+    parser.add_argument("--max-pages", type=int, default=200, help="Stop after this many URLs.")
+    parser.add_argument(
+        "--allow-domain",
+        action="append",
+        default=[],
+        help="Domain to stay within (repeatable; default: the seed domains).",
+    )
+    parser.add_argument("--crawl-workers", type=int, default=8, help="Concurrent crawl requests.")
+    parser.add_argument("--per-host", type=int, default=2, help="Concurrent requests per host.")
+    parser.add_argument(
+        "--crawl-delay", type=float, default=0.5, help="Seconds between requests to one host."
+    )
+    parser.add_argument("--ignore-robots", action="store_true", help="Do not consult robots.txt.")
+
+
+def crawler_from_args(args: argparse.Namespace, **options) -> Crawler:
+    return Crawler(
+        max_depth=args.max_depth,
+        max_pages=args.max_pages,
+        allowed_domains=args.allow_domain,
+        workers=args.crawl_workers,
+        per_host=args.per_host,
+        delay=args.crawl_delay,
+        respect_robots=not args.ignore_robots,
+        **options,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Crawl a site and print URLs to ingest.")
+    add_crawl_arguments(parser)
+    parser.add_argument("urls", nargs="*", help="Start URLs.")
+    args = parser.parse_args()
+    if not args.urls and not args.sitemap:
+        parser.error("provide start URLs and/or --sitemap")
+    for url in crawler_from_args(args).crawl(args.urls, args.sitemap):
+        print(url)
+
+
+if __name__ == "__main__":
+    main()